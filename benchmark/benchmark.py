@@ -0,0 +1,272 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+"""
+    benchmark.py 1.0 - Runs the Pygame experiments without a display for a number
+                       of frames, and reports the time taken by the parts of a
+                       frame as JSON.
+
+    Copyright (C) 2026 hlubenow
+
+    This program is free software: you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import importlib.util
+import json
+import multiprocessing
+import os, sys
+import queue
+import time
+
+from frameprofiler import FrameProfiler
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+""" Every demo has a "Main" (or "Game") class, that can be created with
+    "mainloop = False". Its frame is then driven by calling handleInput(),
+    update(), draw() and present(), and close() at the end.
+    The scripts say, which keys are held down from frame "start" to frame "end"
+    (not included). They are repeated every "period" frames. """
+
+DEMOS = {"horizontal_starfield" : {"path"   : "horizontal_starfield.py/horizontal_starfield.py",
+                                   "class"  : "Main",
+                                   "period" : 1,
+                                   "script" : ()},
+         "scrolling_background" : {"path"   : "scrolling_background.py/scrolling_background.py",
+                                   "class"  : "Main",
+                                   "period" : 200,
+                                   "script" : ((0, 50, "K_RIGHT"), (50, 100, "K_DOWN"),
+                                               (100, 150, "K_LEFT"), (150, 200, "K_UP"))},
+         "rotating_polygons"    : {"path"   : "rotating_polygons/rotating_polygons.py",
+                                   "class"  : "Main",
+                                   "period" : 100,
+                                   "script" : ((0, 50, "K_LEFT"), (50, 100, "K_UP"))},
+         "rainbow_colors"       : {"path"   : "rainbow_colors.py/rainbow_colors.py",
+                                   "class"  : "Main",
+                                   "period" : 1,
+                                   "script" : ()},
+         "vintageinput"         : {"path"   : "vintageinput.py/vintageinput.py",
+                                   "class"  : "Main",
+                                   "period" : 24,
+                                   "script" : ((0, 1, "K_h"), (2, 3, "K_e"), (4, 5, "K_l"),
+                                               (6, 7, "K_l"), (8, 9, "K_o"), (10, 11, "K_SPACE"),
+                                               (12, 13, "K_LEFT"), (14, 15, "K_BACKSPACE"),
+                                               (16, 17, "K_END"), (18, 19, "K_RETURN"))},
+         "yetanothermaze"       : {"path"   : "yetanothermaze.py/yetanothermaze.py",
+                                   "class"  : "Main",
+                                   "period" : 40,
+                                   "script" : ((0, 1, "K_UP"), (10, 11, "K_LEFT"),
+                                               (20, 21, "K_UP"), (30, 31, "K_RIGHT"))},
+         "pygame_code-skeleton" : {"path"   : "pygame_code-skeleton.py/pygame_code-skeleton.py",
+                                   "class"  : "Game",
+                                   "period" : 100,
+                                   "script" : ((0, 50, "K_RIGHT"), (50, 100, "K_DOWN"))}}
+
+PHASES = ("events", "update", "draw", "present", "frame")
+
+# Seconds a demo may take, before it's given up:
+TIMEOUT = 600
+
+
+class ScriptedKeys:
+
+    """ Stands in for the result of pygame.key.get_pressed(). """
+
+    def __init__(self, held):
+        self.held = held
+
+    def __getitem__(self, key):
+        return key in self.held
+
+
+class ScriptedInput:
+
+    """ Presses and releases the keys of a script. The demos either read
+        the keyboard events or pygame.key.get_pressed(), so both are served. """
+
+    def __init__(self, pygame, period, script):
+        self.pygame = pygame
+        self.period = period
+        self.script = []
+        for start, end, keyname in script:
+            self.script.append((start, end, getattr(pygame, keyname)))
+        self.held = set()
+        self.pygame.key.get_pressed = lambda: ScriptedKeys(self.held)
+
+    def apply(self, frame):
+        frame %= self.period
+        held = set()
+        for start, end, key in self.script:
+            if frame >= start and frame < end:
+                held.add(key)
+        for key in held - self.held:
+            self.postKey(self.pygame.KEYDOWN, key)
+        for key in self.held - held:
+            self.postKey(self.pygame.KEYUP, key)
+        self.held = held
+
+    def postKey(self, eventtype, key):
+        self.pygame.event.post(self.pygame.event.Event(eventtype, key = key, mod = 0,
+                                                       scancode = 0, unicode = ""))
+
+
+def loadDemo(name):
+    """ "name" may be followed by arguments for the demo, separated by colons,
+        like "horizontal_starfield:pool:dirty". """
+    args  = name.split(":")
+    demo  = DEMOS[args[0]]
+    path  = os.path.join(REPOSITORY, demo["path"])
+    # The demos load their images and sounds from their own directory:
+    os.chdir(os.path.dirname(path))
+    sys.path.insert(0, os.path.dirname(path))
+    sys.argv = [path] + args[1:]
+    spec   = importlib.util.spec_from_file_location(args[0].replace("-", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return (demo, module)
+
+
+def runDemo(name, frames, warmup, tracefile, resultqueue):
+    """ Runs in a process of its own, so that the demos (and their modules
+        of the same name, like "inputhandler") don't get in each other's way. """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    demo, module = loadDemo(name)
+    import pygame
+    game  = getattr(module, demo["class"])(mainloop = False)
+    input_ = ScriptedInput(pygame, demo["period"], demo["script"])
+    clocktick = int(1000 / getattr(module, "FPS", 50))
+    # Only the last "frames" frames are kept, so the warmup drops out:
+    profiler = FrameProfiler(historysize = frames, tracesize = frames)
+    frame = 0
+    while frame < warmup + frames and game.running:
+        input_.apply(frame)
+        game.clocktick = clocktick
+        profiler.startFrame()
+        with profiler.phase("events"):
+            game.handleInput()
+        with profiler.phase("update"):
+            game.update()
+        with profiler.phase("draw"):
+            game.draw()
+        with profiler.phase("present"):
+            game.present()
+        profiler.endFrame()
+        frame += 1
+    game.close()
+    if tracefile:
+        profiler.writeTrace(tracefile)
+    result = {"frames" : min(frames, max(0, frame - warmup))}
+    if result["frames"] > 0:
+        for phase in PHASES:
+            result[phase] = profiler.getStatistics(phase)
+    resultqueue.put(result)
+
+
+def getResult(process, resultqueue, timeout):
+    """ Waits for the result of the process. If the process dies without one
+        (for example, because the demo raised an exception), this returns at
+        once instead of waiting for the timeout. """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            return resultqueue.get(timeout = 1)
+        except queue.Empty:
+            if not process.is_alive():
+                break
+    # The result may have arrived just before the process ended:
+    try:
+        return resultqueue.get(timeout = 1)
+    except queue.Empty:
+        if process.is_alive():
+            process.terminate()
+            process.join()
+            return {"error" : "no result after " + str(timeout) + " seconds"}
+        process.join()
+        return {"error" : "no result, exit code " + str(process.exitcode)}
+
+
+def benchmark(names, frames, warmup, tracedirectory = None):
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for name in names:
+        tracefile = None
+        if tracedirectory:
+            tracefile = os.path.join(os.path.abspath(tracedirectory), name.replace(":", "_") + ".trace.json")
+        resultqueue = context.Queue()
+        process     = context.Process(target = runDemo, args = (name, frames, warmup, tracefile, resultqueue))
+        process.start()
+        results[name] = getResult(process, resultqueue, TIMEOUT)
+        process.join()
+    return results
+
+
+def findRegressions(results, baseline, tolerance):
+    """ Compares the median and 90th percentile of the whole frame with a
+        former run. Returns a list of messages. """
+    messages = []
+    for name in results:
+        if name not in baseline["demos"] or "frame" not in results[name]:
+            continue
+        for p in ("p50", "p90"):
+            old = baseline["demos"][name]["frame"][p]
+            new = results[name]["frame"][p]
+            if new > old * tolerance:
+                messages.append("%s: frame %s %.4f ms, was %.4f ms" % (name, p, new, old))
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Runs the Pygame experiments without a display and reports their frame times.")
+    parser.add_argument("demos", nargs = "*", default = list(DEMOS.keys()),
+                        help = "demos to run, optionally with arguments, like 'horizontal_starfield:objects' (default: all)")
+    parser.add_argument("--frames", type = int, default = 500, help = "number of frames measured")
+    parser.add_argument("--warmup", type = int, default = 20, help = "number of frames run before measuring")
+    parser.add_argument("--output", help = "write the JSON report to this file instead of printing it")
+    parser.add_argument("--trace", metavar = "DIRECTORY",
+                        help = "write a Chrome trace-event file for every demo into this directory")
+    parser.add_argument("--baseline", help = "JSON report of an earlier run to compare with")
+    parser.add_argument("--tolerance", type = float, default = 1.25,
+                        help = "allowed slowdown factor compared to the baseline")
+    args = parser.parse_args()
+
+    for name in args.demos:
+        if name.split(":")[0] not in DEMOS:
+            parser.error("unknown demo: " + name)
+
+    report = {"frames"      : args.frames,
+              "warmup"      : args.warmup,
+              "videodriver" : os.environ.get("SDL_VIDEODRIVER", "dummy"),
+              "python"      : sys.version.split()[0],
+              "demos"       : benchmark(args.demos, args.frames, args.warmup, args.trace)}
+
+    text = json.dumps(report, indent = 4)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        messages = findRegressions(report["demos"], baseline, args.tolerance)
+        for i in messages:
+            print("Regression: " + i, file = sys.stderr)
+        if messages:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
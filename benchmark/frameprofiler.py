@@ -0,0 +1,247 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+"""
+    frameprofiler.py 1.0 - Measures, how long the parts of a frame (events, update,
+                           draw, present) take in the Pygame experiments. Shows
+                           the times on the screen, and writes them to a trace
+                           file, that can be loaded into "chrome://tracing"
+                           or "https://ui.perfetto.dev".
+
+    Copyright (C) 2026 hlubenow
+
+    This program is free software: you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import collections
+import contextlib
+import importlib.util
+import json
+import os, sys
+import time
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Upper limits of the histogram buckets in milliseconds:
+BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 16, 33, float("inf"))
+
+OVERLAY_SCALEFACTOR = 2
+OVERLAY_COLOR       = (255, 255, 0)
+OVERLAY_BACKGROUND  = (0, 0, 0)
+# The numbers on the overlay are updated every so many frames, to stay readable:
+OVERLAY_REFRESH     = 10
+
+
+class FrameProfiler:
+
+    """ Wrap the phases of a main loop like this:
+
+            profiler.startFrame()
+            with profiler.phase("update"):
+                game.update()
+            ...
+            profiler.endFrame()
+
+        The times of the last "historysize" frames are kept for the statistics
+        and the histograms, the last "tracesize" frames for the trace file. """
+
+    def __init__(self, historysize = 300, tracesize = 10000):
+        self.historysize = historysize
+        self.history     = collections.OrderedDict()
+        self.trace       = collections.deque(maxlen = tracesize)
+        self.frameevents = []
+        self.framestart  = None
+        self.frames      = 0
+        self.starttime   = time.perf_counter()
+        self.overlay     = None
+        self.chars       = None
+
+    def startFrame(self):
+        self.framestart  = time.perf_counter()
+        self.frameevents = []
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def record(self, name, start, end):
+        if name not in self.history:
+            self.history[name] = collections.deque(maxlen = self.historysize)
+        self.history[name].append(end - start)
+        self.frameevents.append((name, start, end))
+
+    def endFrame(self):
+        end = time.perf_counter()
+        self.record("frame", self.framestart, end)
+        self.trace.append(self.frameevents)
+        self.frames += 1
+
+    def getTimes(self, name):
+        """ Times of the phase in the last frames, in seconds. """
+        return list(self.history.get(name, ()))
+
+    def getStatistics(self, name):
+        """ Mean, nearest-rank percentiles and maximum in milliseconds. """
+        times = sorted(self.getTimes(name))
+        if not times:
+            return {}
+        result = {"mean" : sum(times) / len(times) * 1000}
+        for p in (50, 90, 99):
+            result["p" + str(p)] = times[min(len(times) - 1, len(times) * p // 100)] * 1000
+        result["max"] = times[-1] * 1000
+        for i in result:
+            result[i] = round(result[i], 4)
+        return result
+
+    def getHistogram(self, name):
+        """ Number of frames in each of the BUCKETS. """
+        counts = [0] * len(BUCKETS)
+        for t in self.getTimes(name):
+            t *= 1000
+            for i in range(len(BUCKETS)):
+                if t <= BUCKETS[i]:
+                    counts[i] += 1
+                    break
+        return counts
+
+    def writeTrace(self, filename):
+        """ Writes the trace-event format of Chrome ("complete" events,
+            times in microseconds). """
+        events = []
+        for frameevents in self.trace:
+            for name, start, end in frameevents:
+                events.append({"name" : name,
+                               "cat"  : "frame" if name == "frame" else "phase",
+                               "ph"   : "X",
+                               "ts"   : round((start - self.starttime) * 1000000, 3),
+                               "dur"  : round((end - start) * 1000000, 3),
+                               "pid"  : 1,
+                               "tid"  : 1})
+        with open(filename, "w") as fh:
+            json.dump({"traceEvents" : events, "displayTimeUnit" : "ms"}, fh)
+
+    def loadCharset(self):
+        """ Borrows the ZX Spectrum character set of "vintageinput.py". """
+        path   = os.path.join(REPOSITORY, "vintageinput.py", "vintageinput.py")
+        spec   = importlib.util.spec_from_file_location("zxcharset", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        module.CHARSETFILENAME = os.path.join(os.path.dirname(path), module.CHARSETFILENAME)
+        module.SCALEFACTOR     = OVERLAY_SCALEFACTOR
+        colorset = {"ink" : OVERLAY_COLOR, "textcursor" : OVERLAY_COLOR}
+        self.chars = module.CharacterSetBuilder(colorset).getSurfaces()
+
+    def renderOverlay(self):
+        import pygame
+        if self.chars is None:
+            self.loadCharset()
+        charsize = 8 * OVERLAY_SCALEFACTOR
+        lines = ["PHASE    MEAN   P90   MAX"]
+        names = list(self.history.keys())
+        for name in names:
+            s = self.getStatistics(name)
+            lines.append("%-7s%6.2f%6.2f%6.2f" % (name.upper()[:7], s["mean"], s["p90"], s["max"]))
+        histogramx = 26 * charsize
+        width  = histogramx + len(BUCKETS) * 2 * OVERLAY_SCALEFACTOR + charsize
+        self.overlay = pygame.Surface((width, len(lines) * charsize + charsize))
+        self.overlay = self.overlay.convert()
+        self.overlay.fill(OVERLAY_BACKGROUND)
+        y = charsize // 2
+        for line in lines:
+            x = charsize // 2
+            for char in line:
+                if char in self.chars:
+                    self.overlay.blit(self.chars[char].surface, (x, y))
+                x += charsize
+            y += charsize
+        # A small histogram for every phase (short times left):
+        for n in range(len(names)):
+            counts = self.getHistogram(names[n])
+            top    = charsize // 2 + (n + 1) * charsize
+            for i in range(len(counts)):
+                if counts[i]:
+                    height = max(1, counts[i] * (charsize - 2) // max(counts))
+                    pygame.draw.rect(self.overlay, OVERLAY_COLOR,
+                                     (histogramx + i * 2 * OVERLAY_SCALEFACTOR,
+                                      top + charsize - 1 - height,
+                                      OVERLAY_SCALEFACTOR, height))
+
+    def drawOverlay(self, screen, position = (0, 0)):
+        """ Returns the rect drawn, for loops, that only update dirty rects. """
+        if self.overlay is None or self.frames % OVERLAY_REFRESH == 0:
+            self.renderOverlay()
+        return screen.blit(self.overlay, position)
+
+
+def loadDemo(name):
+    """ Like in "benchmark.py", "name" may be followed by arguments for the demo,
+        separated by colons. """
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import benchmark
+    return benchmark.loadDemo(name)
+
+
+def runProfiled(game, fps, profiler, overlay, frames = None):
+    """ The main loop of the demos with the phases wrapped. """
+    frame = 0
+    while game.running and (frames is None or frame < frames):
+        profiler.startFrame()
+        with profiler.phase("tick"):
+            game.clocktick = game.clock.tick(fps)
+        with profiler.phase("events"):
+            game.handleInput()
+        with profiler.phase("update"):
+            game.update()
+        with profiler.phase("draw"):
+            game.draw()
+        if overlay:
+            with profiler.phase("overlay"):
+                rect = profiler.drawOverlay(game.screen)
+                # Loops in "dirty" mode only update the rects, they've drawn:
+                if hasattr(game, "rects"):
+                    game.rects.append(rect)
+        with profiler.phase("present"):
+            game.present()
+        profiler.endFrame()
+        frame += 1
+    game.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Runs one of the Pygame experiments and profiles its frames.")
+    parser.add_argument("demo", help = "demo to run, optionally with arguments, like 'horizontal_starfield:dirty'")
+    parser.add_argument("--overlay", action = "store_true", help = "show the frame times on the screen")
+    parser.add_argument("--trace", help = "write a Chrome trace-event file at the end")
+    parser.add_argument("--frames", type = int, help = "stop after this number of frames")
+    args = parser.parse_args()
+    if args.trace:
+        # The demo changes into its own directory:
+        args.trace = os.path.abspath(args.trace)
+
+    demo, module = loadDemo(args.demo)
+    game = getattr(module, demo["class"])(mainloop = False)
+    profiler = FrameProfiler()
+    runProfiled(game, getattr(module, "FPS", 50), profiler, args.overlay, args.frames)
+    if args.trace:
+        profiler.writeTrace(args.trace)
+    for name in profiler.history:
+        print(name, profiler.getStatistics(name))
+
+if __name__ == "__main__":
+    main()
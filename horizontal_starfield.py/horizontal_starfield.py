@@ -23,14 +23,68 @@
 """
 
 import pygame
-import os
+import numpy as np
+import os, sys
 import random
+from multiprocessing import Pool, shared_memory
+import starfieldworker
 
 SCALEFACTOR = 3
 FPS         = 50
 
+# The stars are moved in fixed simulation steps of this length (in milliseconds),
+# whatever the frame rate is. The star speeds are given in pixels per step:
+SIMULATION_STEP = 20
+# If the program falls further behind than that, the rest of the time is dropped:
+MAX_STEPS_PER_FRAME = 10
+
 STARS_PER_GROUP = 30
 
+# "horizontal": the stars move from right to left (as seen on the Amiga),
+# "warp":       the stars come towards the viewer in 3D:
+STARFIELD  = "horizontal"
+WARP_STARS = 50000
+# Distances of the near and far plane, and how far the stars move in one step:
+WARP_NEAR  = 0.05
+WARP_FAR   = 4.0
+WARP_SPEED = 0.02
+
+# "objects": one Star object per star (the original code),
+# "array":   all stars in NumPy arrays, moved and drawn in one go,
+# "pool":    horizontal bands of the paper drawn by a pool of processes:
+BACKEND = "array"
+
+# Number of worker processes of the "pool" backend (None: one per CPU core):
+POOL_PROCESSES = None
+
+# What to do, if there are more stars than pixel rows on the paper:
+# "share": several stars share a row, "error": raise a ValueError.
+ROW_POLICY = "share"
+
+# "flip":  clear and redraw the whole screen every frame,
+# "dirty": only erase and redraw the stars, and update just these rects:
+RENDERMODE = "flip"
+
+# Dirty rects of the "array" backend are merged on a grid of this size (pixels):
+DIRTY_CELLSIZE = 32
+
+# With SUBPIXEL, the stars aren't snapped to whole pixels. Each star is drawn
+# one pixel wider, with its left and right column dimmed according to how far
+# it is between two pixels. The sprites for SUBPIXEL_STEPS positions between
+# two pixels are made in advance:
+SUBPIXEL       = False
+SUBPIXEL_STEPS = 8
+
+for arg in sys.argv[1:]:
+    if arg in ("objects", "array", "pool"):
+        BACKEND = arg
+    if arg in ("flip", "dirty"):
+        RENDERMODE = arg
+    if arg in ("horizontal", "warp"):
+        STARFIELD = arg
+    if arg == "subpixel":
+        SUBPIXEL = True
+
 BLACK = (0, 0, 0)
 
 class Environment:
@@ -47,78 +101,493 @@ class Environment:
         self.screenwidth     = self.pc_paperwidth + 2 * self.pc_borderwidth
         self.screenheight    = self.pc_paperheight + 2 * self.pc_borderheight
 
+def getSubpixelColors(color, step, scalefactor):
+    """ The colors of the scalefactor + 1 columns of a star, that is "step"
+        SUBPIXEL_STEPS right of a whole pixel: Each column gets the brightness
+        of the part of it, that is covered by the star. """
+    left = step / SUBPIXEL_STEPS
+    colors = []
+    for column in range(scalefactor + 1):
+        coverage = max(0, min(column + 1, left + scalefactor) - max(column, left))
+        colors.append(tuple(int(round(i * coverage)) for i in color))
+    return colors
+
+class StarAtlas:
+
+    """ A single small surface with one star sprite for every brightness level
+        side by side. The sprites are subsurfaces of it, stars only keep the
+        index of their sprite. Below that, there's a row with the sub-pixel
+        sprites (see SUBPIXEL) for every brightness level. """
+
+    def __init__(self, colors, scalefactor):
+        subpixelwidth = (scalefactor + 1) * SUBPIXEL_STEPS
+        self.surface = pygame.Surface((max(scalefactor, subpixelwidth) * len(colors), 2 * scalefactor))
+        self.surface = self.surface.convert()
+        self.surface.fill(BLACK)
+        self.sprites = []
+        self.subpixelsprites = []
+        for i in range(len(colors)):
+            rect = pygame.Rect(i * scalefactor, 0, scalefactor, scalefactor)
+            self.surface.fill(colors[i], rect)
+            self.sprites.append(self.surface.subsurface(rect))
+            self.subpixelsprites.append([])
+            for step in range(SUBPIXEL_STEPS):
+                left = i * subpixelwidth + step * (scalefactor + 1)
+                rect = pygame.Rect(left, scalefactor, scalefactor + 1, scalefactor)
+                columns = getSubpixelColors(colors[i], step, scalefactor)
+                for column in range(scalefactor + 1):
+                    self.surface.fill(columns[column], (left + column, scalefactor, 1, scalefactor))
+                self.subpixelsprites[i].append(self.surface.subsurface(rect))
+
+STARATLASES = {}
+
+def getStarAtlas(colors, scalefactor):
+    # All stars share the same atlas for the same colors and size:
+    key = (tuple(colors), scalefactor)
+    if key not in STARATLASES:
+        STARATLASES[key] = StarAtlas(colors, scalefactor)
+    return STARATLASES[key]
+
 class Star:
 
-    def __init__(self, env_, color, position, speed):
-        self.env_      = env_
-        self.surface   = pygame.Surface((SCALEFACTOR, SCALEFACTOR))
-        self.surface   = self.surface.convert()
-        self.rect      = self.surface.get_rect()
-        self.speed     = speed
-        self.posx      = position[0]
-        self.initposx  = self.posx
-        self.posy      = position[1]
-        self.surface.fill(color)
-        self.timer     = pygame.time.get_ticks()
+    def __init__(self, env_, atlas, atlasindex, position, speed):
+        self.env_       = env_
+        self.atlas      = atlas
+        self.atlasindex = atlasindex
+        self.speed      = speed
+        self.posx       = position[0]
+        self.initposx   = self.posx
+        self.prevposx   = self.posx
+        self.drawx      = self.posx
+        self.posy       = position[1]
+        self.drawnrect  = None
 
     def inScreenRange(self):
         # Only draw stars, when they're on the "paper" (= insider the border):
-        if self.posx <= self.env_.pc_borderwidth + self.env_.pc_paperwidth and self.posx >= self.env_.pc_borderwidth:
+        if self.drawx <= self.env_.pc_borderwidth + self.env_.pc_paperwidth and self.drawx >= self.env_.pc_borderwidth:
             return True
         else:
             return False
  
-    def moveLeft(self, clocktick):
+    def moveLeft(self):
+        self.prevposx = self.posx
         self.posx -= self.speed * SCALEFACTOR
         if self.posx < 0:
             self.posx = self.initposx
-        self.rect.topleft = (self.posx, self.posy)
+            self.prevposx = self.posx
+
+    def interpolate(self, alpha):
+        # Position between the last two simulation steps:
+        self.drawx = self.prevposx + (self.posx - self.prevposx) * alpha
 
     def draw(self, screen):
-        screen.blit(self.surface, self.rect)
+        if SUBPIXEL:
+            sprite = self.atlas.subpixelsprites[self.atlasindex][int(self.drawx % 1 * SUBPIXEL_STEPS)]
+        else:
+            sprite = self.atlas.sprites[self.atlasindex]
+        self.drawnrect = screen.blit(sprite, (int(self.drawx), int(self.posy)))
+
+    def erase(self, screen):
+        if self.drawnrect:
+            screen.fill(BLACK, self.drawnrect)
+
+class StarfieldObjects:
+
+    def __init__(self, env_, colors, positions, speeds, colorindices):
+        atlas = getStarAtlas(colors, SCALEFACTOR)
+        self.stars = []
+        for i in range(len(positions)):
+            self.stars.append(Star(env_, atlas, colorindices[i], positions[i], speeds[i]))
+
+    def move(self):
+        for star in self.stars:
+            star.moveLeft()
+
+    def draw(self, screen, alpha):
+        for star in self.stars:
+            star.interpolate(alpha)
+            if star.inScreenRange():
+                star.draw(screen)
+
+    def drawDirty(self, screen, alpha):
+        """ Erases the stars at their old positions and draws them at the new
+            ones. Returns the rects, that have changed. """
+        for star in self.stars:
+            star.erase(screen)
+        rects = []
+        for star in self.stars:
+            oldrect = star.drawnrect
+            star.interpolate(alpha)
+            if star.inScreenRange():
+                star.draw(screen)
+                if oldrect:
+                    rects.append(oldrect.union(star.drawnrect))
+                else:
+                    rects.append(star.drawnrect)
+            elif oldrect:
+                star.drawnrect = None
+                rects.append(oldrect)
+        return rects
+
+    def close(self):
+        pass
+
+class StarfieldArray:
+
+    """ Keeps x, y, speed and color of all stars in NumPy arrays. So all stars
+        can be moved in one vectorized step, and the visible ones are written
+        into the screen pixels in a single pass, instead of calling Python code
+        (and creating a Surface) for every single star. """
+
+    def __init__(self, env_, colors, positions, speeds, colorindices):
+        self.env_       = env_
+        self.colors     = colors
+        positions       = np.array(positions, dtype = np.float64).reshape(-1, 2)
+        self.posx       = positions[:, 0].copy()
+        self.initposx   = self.posx.copy()
+        self.prevposx   = self.posx.copy()
+        self.posy       = positions[:, 1].astype(np.intp)
+        self.speed      = np.array(speeds, dtype = np.float64) * SCALEFACTOR
+        self.colorindex = np.array(colorindices, dtype = np.intp)
+        self.mappedcolors = None
+        self.spritewidth  = SCALEFACTOR + 1 if SUBPIXEL else SCALEFACTOR
+        # Positions, where the stars were drawn last (for "dirty" mode):
+        self.drawnx = np.zeros(0, dtype = np.intp)
+        self.drawny = np.zeros(0, dtype = np.intp)
+
+    def move(self):
+        self.prevposx[:] = self.posx
+        self.posx -= self.speed
+        wrapped = self.posx < 0
+        self.posx[wrapped] = self.initposx[wrapped]
+        self.prevposx[wrapped] = self.posx[wrapped]
+
+    def getVisibleStars(self, screen, alpha):
+        if self.mappedcolors is None:
+            self.mapColors(screen)
+        drawx   = self.prevposx + (self.posx - self.prevposx) * alpha
+        left    = self.env_.pc_borderwidth
+        visible = (drawx >= left) & (drawx <= left + self.env_.pc_paperwidth)
+        x = drawx[visible].astype(np.intp)
+        y = self.posy[visible]
+        if SUBPIXEL:
+            # A row of column colors for every star:
+            steps = (drawx[visible] % 1 * SUBPIXEL_STEPS).astype(np.intp)
+            c = self.subpixelcolors[self.colorindex[visible], steps]
+        else:
+            c = self.mappedcolors[self.colorindex[visible]]
+        return (x, y, c)
+
+    def mapColors(self, screen):
+        # Colors in the pixel format of the screen:
+        self.mappedcolors = np.array([screen.map_rgb(c) for c in self.colors], dtype = np.uint32)
+        # Table of (brightness level, sub-pixel step, column):
+        self.subpixelcolors = np.zeros((len(self.colors), SUBPIXEL_STEPS, SCALEFACTOR + 1), dtype = np.uint32)
+        for i in range(len(self.colors)):
+            for step in range(SUBPIXEL_STEPS):
+                columns = getSubpixelColors(self.colors[i], step, SCALEFACTOR)
+                self.subpixelcolors[i, step] = [screen.map_rgb(c) for c in columns]
+
+    def plot(self, pixels, x, y, c):
+        for dy in range(SCALEFACTOR):
+            for dx in range(self.spritewidth):
+                if np.ndim(c) == 2:
+                    pixels[x + dx, y + dy] = c[:, dx]
+                else:
+                    pixels[x + dx, y + dy] = c
+
+    def draw(self, screen, alpha):
+        x, y, c = self.getVisibleStars(screen, alpha)
+        pixels = pygame.surfarray.pixels2d(screen)
+        self.plot(pixels, x, y, c)
+        # Unlocks the screen again:
+        del pixels
+
+    def drawDirty(self, screen, alpha):
+        """ Erases the stars at their old positions and draws them at the new
+            ones. With thousands of stars, a rect for every single star would
+            make pygame.display.update() slow. So the changed areas are merged
+            on a grid of DIRTY_CELLSIZE, and the rects of that grid are returned. """
+        x, y, c = self.getVisibleStars(screen, alpha)
+        pixels = pygame.surfarray.pixels2d(screen)
+        self.plot(pixels, self.drawnx, self.drawny, screen.map_rgb(BLACK))
+        self.plot(pixels, x, y, c)
+        del pixels
+        rects = self.getDirtyRects(screen,
+                                   np.concatenate((self.drawnx, x)),
+                                   np.concatenate((self.drawny, y)))
+        self.drawnx = x
+        self.drawny = y
+        return rects
+
+    def getDirtyRects(self, screen, x, y):
+        cells   = DIRTY_CELLSIZE
+        columns = screen.get_width() // cells + 1
+        # Every star touches at most two cell rows, and the row of cells between
+        # its left and right edge. Marking the ends of these ranges and summing
+        # them up along the rows gives the dirty cells:
+        rows  = screen.get_height() // cells + 1
+        marks = np.zeros(rows * (columns + 1), dtype = np.int64)
+        left  = x // cells
+        right = (x + self.spritewidth - 1) // cells + 1
+        for top in (y // cells, (y + SCALEFACTOR - 1) // cells):
+            marks += np.bincount(top * (columns + 1) + left, minlength = len(marks))
+            marks -= np.bincount(top * (columns + 1) + right, minlength = len(marks))
+        dirty = np.cumsum(marks.reshape(rows, columns + 1), axis = 1)[:, :columns] > 0
+        # Runs of dirty cells in a row become one rect:
+        edges = np.diff(np.pad(dirty, ((0, 0), (1, 1))).astype(np.int8), axis = 1)
+        starts = np.argwhere(edges == 1)
+        ends   = np.argwhere(edges == -1)
+        rects = []
+        for i in range(len(starts)):
+            rects.append(pygame.Rect(starts[i][1] * cells, starts[i][0] * cells,
+                                     (ends[i][1] - starts[i][1]) * cells, cells))
+        return rects
+
+    def close(self):
+        pass
+
+class WarpStarfield(StarfieldArray):
+
+    """ Stars at (x, y, z) in contiguous arrays, that come towards the viewer
+        and are projected onto the paper with one vectorized perspective divide.
+        As all stars move with the same speed, their order by depth never changes,
+        except for the stars passing the near plane. These are moved back to the
+        far plane (with new x and y), where they become the farthest stars. So the
+        arrays are used as a ring, that starts with the farthest star at "self.start".
+        Drawing the stars in that order from far to near means, that near stars
+        are drawn over far ones, without sorting anything. """
+
+    def __init__(self, env_, colors, nrofstars):
+        self.env_   = env_
+        self.colors = colors
+        self.centerx = self.env_.pc_borderwidth + self.env_.pc_paperwidth // 2
+        self.centery = self.env_.pc_borderheight + self.env_.pc_paperheight // 2
+        self.focallength = self.env_.pc_paperwidth // 2
+        self.z      = np.sort(np.random.uniform(WARP_NEAR, WARP_FAR, nrofstars))[::-1].copy()
+        self.x      = self.getRandomX(self.z)
+        self.y      = self.getRandomY(self.z)
+        self.start  = 0
+        self.mappedcolors = None
+        self.spritewidth  = SCALEFACTOR
+        self.drawnx = np.zeros(0, dtype = np.intp)
+        self.drawny = np.zeros(0, dtype = np.intp)
+
+    # Positions, that are on the paper at depth z:
+    def getRandomX(self, z):
+        return np.random.uniform(-1, 1, len(z)) * z * (self.env_.pc_paperwidth // 2) / self.focallength
+
+    def getRandomY(self, z):
+        return np.random.uniform(-1, 1, len(z)) * z * (self.env_.pc_paperheight // 2) / self.focallength
+
+    def move(self):
+        self.z -= WARP_SPEED
+        passed = np.count_nonzero(self.z <= WARP_NEAR)
+        if passed == 0:
+            return
+        # The nearest stars are the last ones of the ring:
+        indices = (self.start - 1 - np.arange(passed)) % len(self.z)
+        self.z[indices] += WARP_FAR - WARP_NEAR
+        self.x[indices] = self.getRandomX(self.z[indices])
+        self.y[indices] = self.getRandomY(self.z[indices])
+        self.start = (self.start - passed) % len(self.z)
+
+    def getVisibleStars(self, screen, alpha):
+        if self.mappedcolors is None:
+            self.mapColors(screen)
+        # From far to near:
+        order = np.concatenate((np.arange(self.start, len(self.z)), np.arange(self.start)))
+        z = self.z[order] + WARP_SPEED * (1 - alpha)
+        x = (self.centerx + self.x[order] / z * self.focallength).astype(np.intp)
+        y = (self.centery + self.y[order] / z * self.focallength).astype(np.intp)
+        visible = ((x >= self.env_.pc_borderwidth) &
+                   (x <= self.env_.pc_borderwidth + self.env_.pc_paperwidth - SCALEFACTOR) &
+                   (y >= self.env_.pc_borderheight) &
+                   (y <= self.env_.pc_borderheight + self.env_.pc_paperheight - SCALEFACTOR))
+        # The nearer, the brighter:
+        brightness = ((WARP_FAR - z[visible]) * len(self.colors) / (WARP_FAR - WARP_NEAR)).astype(np.intp)
+        c = self.mappedcolors[np.clip(brightness, 0, len(self.colors) - 1)]
+        return (x[visible], y[visible], c)
+
+class StarfieldPool:
+
+    """ The paper is divided into horizontal bands. A pool of worker processes
+        (see starfieldworker.py) draws them into an RGB buffer in shared memory.
+        The main process just counts the simulation steps, and blits the buffer
+        onto the screen. So the starfield can use idle cores, while the main
+        process does other things. """
+
+    def __init__(self, env_, colors, positions, speeds, colorindices):
+        self.env_  = env_
+        self.step  = 0
+        self.paper = pygame.Surface((self.env_.pc_paperwidth, self.env_.pc_paperheight))
+        self.paper = self.paper.convert()
+        self.paperpos = (self.env_.pc_borderwidth, self.env_.pc_borderheight)
+        papersize  = (self.env_.pc_paperwidth, self.env_.pc_paperheight)
+        self.shm   = shared_memory.SharedMemory(create = True, size = papersize[0] * papersize[1] * 3)
+        self.buffer = np.ndarray((papersize[0], papersize[1], 3), dtype = np.uint8, buffer = self.shm.buf)
+        self.buffer[:] = 0
+        processes  = POOL_PROCESSES or os.cpu_count() or 1
+        bandheight = -(-papersize[1] // processes)
+        self.bands = []
+        for top in range(0, papersize[1], bandheight):
+            self.bands.append((top, min(top + bandheight, papersize[1])))
+        positions  = np.array(positions, dtype = np.float64).reshape(-1, 2)
+        self.pool  = Pool(processes,
+                          initializer = starfieldworker.initWorker,
+                          initargs = (self.shm.name, papersize,
+                                      (self.env_.pc_borderwidth, self.env_.pc_borderheight),
+                                      SCALEFACTOR, self.bands,
+                                      positions[:, 0],
+                                      positions[:, 1].astype(np.intp),
+                                      np.array(speeds, dtype = np.float64) * SCALEFACTOR,
+                                      np.array(colors, dtype = np.uint8)[colorindices]))
+
+    def move(self):
+        self.step += 1
+
+    def draw(self, screen, alpha):
+        self.pool.map(starfieldworker.drawBand,
+                      [(band, self.step, alpha) for band in range(len(self.bands))])
+        pygame.surfarray.blit_array(self.paper, self.buffer)
+        screen.blit(self.paper, self.paperpos)
+
+    def drawDirty(self, screen, alpha):
+        # The workers redraw the whole paper anyway:
+        self.draw(screen, alpha)
+        return [self.paper.get_rect(topleft = self.paperpos)]
+
+    def close(self):
+        # The workers are idle between the frames, so they can just be let go:
+        self.pool.close()
+        self.pool.join()
+        del self.buffer
+        self.shm.close()
+        self.shm.unlink()
+
+class FixedTimestep:
+
+    """ Accumulates the real time passed, and tells, how many simulation steps
+        of fixed length have to be run to catch up with it. The time left over
+        is returned as "alpha" (0 <= alpha < 1), the fraction of a step, by
+        which the drawing positions are interpolated. So the speed of the stars
+        only depends on the wall-clock time, not on the frame rate. """
+
+    def __init__(self, steplength, maxsteps):
+        self.steplength  = steplength
+        self.maxsteps    = maxsteps
+        self.accumulator = 0
+        self.alpha       = 0
+
+    def advance(self, clocktick):
+        self.accumulator += clocktick
+        steps = int(self.accumulator // self.steplength)
+        if steps > self.maxsteps:
+            steps = self.maxsteps
+            self.accumulator = self.maxsteps * self.steplength
+        self.accumulator -= steps * self.steplength
+        self.alpha = self.accumulator / self.steplength
+        return steps
+
+def allocateRows(nrofstars, nrofrows, policy):
+
+    """ Returns a y-offset (0 <= y < nrofrows) for every star. As long as
+        possible, every star gets a row of its own. The free rows are drawn
+        with random.sample(), so this takes linear time, however full the
+        paper gets. """
+
+    if nrofstars <= nrofrows:
+        return random.sample(range(nrofrows), nrofstars)
+    if policy == "share":
+        # Every row is used equally often:
+        rows = list(range(nrofrows)) * (nrofstars // nrofrows)
+        rows += random.sample(range(nrofrows), nrofstars % nrofrows)
+        random.shuffle(rows)
+        return rows
+    raise ValueError("Can't place " + str(nrofstars) + " stars in " + str(nrofrows) + " rows.")
 
 class Main:
 
-    def __init__(self):
+    def __init__(self, mainloop = True):
         self.env_  = Environment()
         os.environ['SDL_VIDEO_WINDOW_POS'] = "78, 2"
         pygame.init()
         self.screen = pygame.display.set_mode((self.env_.screenwidth, self.env_.screenheight))
         pygame.display.set_caption("Horizontal Starfield")
         self.clock = pygame.time.Clock()
+        self.timestep = FixedTimestep(SIMULATION_STEP, MAX_STEPS_PER_FRAME)
         self.createStarfield()
         self.running = True
+        self.clocktick = 0
+        self.rects = []
+        self.screen.fill(BLACK)
+        pygame.display.flip()
+        if mainloop:
+            self.mainLoop()
 
+    def mainLoop(self):
+        # A frame is split into these steps, so that it can also be driven
+        # from outside (see "benchmark/benchmark.py"):
         while self.running:
             self.clocktick = self.clock.tick(FPS)
-            if self.processEvents() == "quit":
-                self.running = False
+            self.handleInput()
+            self.update()
+            self.draw()
+            self.present()
+        self.close()
+
+    def handleInput(self):
+        if self.processEvents() == "quit":
+            self.running = False
+
+    def update(self):
+        for i in range(self.timestep.advance(self.clocktick)):
+            self.starfield.move()
+
+    def draw(self):
+        if RENDERMODE == "dirty":
+            self.rects = self.starfield.drawDirty(self.screen, self.timestep.alpha)
+        else:
             self.screen.fill(BLACK)
-            for star in self.starfield:
-                star.moveLeft(self.clocktick)
-                if star.inScreenRange():
-                    star.draw(self.screen)
+            self.starfield.draw(self.screen, self.timestep.alpha)
+
+    def present(self):
+        if RENDERMODE == "dirty":
+            pygame.display.update(self.rects)
+        else:
             pygame.display.flip()
 
+    def close(self):
+        self.starfield.close()
         pygame.quit()
 
     def createStarfield(self):
-        self.starfield = []
         colors = []
         for i in (85, 119, 187, 255):
             colors.append((i, i, i))
+        if STARFIELD == "warp":
+            self.starfield = WarpStarfield(self.env_, colors, WARP_STARS)
+            return
         speeds = [1.5, 2.2, 2.7, 3.5]
-        h = {}
+        positions    = []
+        starspeeds   = []
+        colorindices = []
+        # Every star should have its own y-coordinate:
+        rows = allocateRows(4 * STARS_PER_GROUP, self.env_.pc_paperheight, ROW_POLICY)
         for g in range(4):
             for n in range(STARS_PER_GROUP):
                 # Start stars one screen-size right to the visible screen:
                 x = self.env_.screenwidth + random.randrange(self.env_.screenwidth)
-                y = self.env_.pc_borderheight + random.randrange(self.env_.pc_paperheight)
-                # Every star should have its own y-coordinate:
-                while y in h:
-                    y = self.env_.pc_borderheight + random.randrange(self.env_.pc_paperheight)
-                h[y] = 1
-                self.starfield.append(Star(self.env_, colors[g], (x, y), speeds[g]))
+                y = self.env_.pc_borderheight + rows[g * STARS_PER_GROUP + n]
+                positions.append((x, y))
+                starspeeds.append(speeds[g])
+                colorindices.append(g)
+        if BACKEND == "array":
+            self.starfield = StarfieldArray(self.env_, colors, positions, starspeeds, colorindices)
+        elif BACKEND == "pool":
+            self.starfield = StarfieldPool(self.env_, colors, positions, starspeeds, colorindices)
+        else:
+            self.starfield = StarfieldObjects(self.env_, colors, positions, starspeeds, colorindices)
 
     def processEvents(self):
         pygame.event.pump()
@@ -127,4 +596,5 @@ class Main:
             return "quit"
         return 0
 
-Main()
+if __name__ == "__main__":
+    Main()
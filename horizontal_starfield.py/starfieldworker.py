@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+"""
+    starfieldworker.py - Worker processes for the "pool" backend of
+                         horizontal_starfield.py.
+
+    Copyright (C) 2021 hlubenow
+
+    This program is free software: you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import signal
+
+import numpy as np
+from multiprocessing import shared_memory
+
+""" Every worker draws horizontal bands of the paper into a shared RGB buffer.
+    The workers don't keep any state between the frames: The position of a star
+    only depends on the number of simulation steps done so far. A star starts at
+    "initposx" and moves "speed" pixels to the left in each step, until it's left
+    of the screen, and then starts again at "initposx". So it repeats every
+    "cycle" steps. This module doesn't import Pygame, so the workers start fast. """
+
+WORKER = {}
+
+def initWorker(shmname, papersize, border, scalefactor, bands, initposx, posy, speed, colors):
+    # The workers are forked after pygame.init(), and SDL's handler of SIGTERM
+    # would keep them alive, when the pool is terminated:
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    shm = shared_memory.SharedMemory(name = shmname)
+    # The paper is laid out (width, height, 3), like pygame.surfarray:
+    WORKER["shm"]         = shm
+    WORKER["paper"]       = np.ndarray((papersize[0], papersize[1], 3), dtype = np.uint8, buffer = shm.buf)
+    WORKER["scalefactor"] = scalefactor
+    WORKER["bands"]       = bands
+    # Coordinates on the paper instead of the screen:
+    WORKER["initposx"]    = initposx - border[0]
+    WORKER["posy"]        = posy - border[1]
+    WORKER["speed"]       = speed
+    WORKER["cycle"]       = np.floor(initposx / speed).astype(np.int64) + 1
+    WORKER["colors"]      = colors
+    # The stars, that touch a band:
+    WORKER["bandstars"]   = []
+    for top, bottom in bands:
+        touching = (WORKER["posy"] + scalefactor > top) & (WORKER["posy"] < bottom)
+        WORKER["bandstars"].append(np.flatnonzero(touching))
+
+def drawBand(args):
+    band, step, alpha = args
+    top, bottom = WORKER["bands"][band]
+    paper       = WORKER["paper"]
+    scalefactor = WORKER["scalefactor"]
+    stars       = WORKER["bandstars"][band]
+    speed       = WORKER["speed"][stars]
+    phase       = step % WORKER["cycle"][stars]
+    x = WORKER["initposx"][stars] - phase * speed
+    # Interpolation between the last two steps (not, if the star just started again):
+    x = np.where(phase > 0, x + speed * (1 - alpha), x)
+    visible = (x >= 0) & (x <= paper.shape[0])
+    x = x[visible].astype(np.intp)
+    y = WORKER["posy"][stars][visible]
+    c = WORKER["colors"][stars][visible]
+    paper[:, top:bottom] = 0
+    for dy in range(scalefactor):
+        for dx in range(scalefactor):
+            inband = (y + dy >= top) & (y + dy < bottom) & (x + dx < paper.shape[0])
+            paper[x[inband] + dx, y[inband] + dy] = c[inband]
+    return band
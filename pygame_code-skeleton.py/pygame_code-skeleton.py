@@ -29,7 +29,7 @@ import os
 
 class Game:
 
-    def __init__(self):
+    def __init__(self, mainloop = True):
         os.environ['SDL_VIDEO_WINDOW_POS'] = str(WINDOWPOSITION_X) + ", " + str(WINDOWPOSITION_Y)
         pygame.init()
         self.screen = pygame.display.set_mode((SSIZE_SCREEN_X * SCALEFACTOR, SSIZE_SCREEN_Y * SCALEFACTOR))
@@ -38,15 +38,35 @@ class Game:
         self.clock = pygame.time.Clock()
         self.initSprites()
         self.running = True
+        self.clocktick = 0
+        if mainloop:
+            self.mainLoop()
+
+    def mainLoop(self):
+        # A frame is split into these steps, so that it can also be driven
+        # from outside (see "benchmark/benchmark.py"):
         while self.running:
             self.clocktick = self.clock.tick(FPS)
-            self.screen.fill((0, 0, 0))
-            self.checkInput()
+            self.handleInput()
+            self.update()
+            self.draw()
+            self.present()
+        self.close()
+
+    def handleInput(self):
+        self.checkInput()
+
+    def update(self):
+        self.playergroup.update()
+
+    def draw(self):
+        self.screen.fill((0, 0, 0))
+        self.playergroup.draw(self.screen)
 
-            self.playergroup.update()
-            self.playergroup.draw(self.screen)
+    def present(self):
+        pygame.display.flip()
 
-            pygame.display.flip()
+    def close(self):
         pygame.quit()
 
     def initSprites(self):
@@ -61,5 +81,6 @@ class Game:
             return
 
 
-Game()
+if __name__ == "__main__":
+    Game()
 
@@ -398,7 +398,7 @@ class ATData:
 
 class Main:
 
-    def __init__(self):
+    def __init__(self, mainloop = True):
         self.at_data = ATData()
         self.at_env  = ATEnvironment(self.at_data)
         os.environ['SDL_VIDEO_WINDOW_POS'] = "78, 2"
@@ -415,18 +415,38 @@ class Main:
                                        lineheight  = 1,
                                        at_position = (60, 50))
         self.running = True
+        self.clocktick = 0
+        if mainloop:
+            self.mainLoop()
 
+    def mainLoop(self):
+        # A frame is split into these steps, so that it can also be driven
+        # from outside (see "benchmark/benchmark.py"):
         while self.running:
             self.clocktick = self.clock.tick(FPS)
-            if self.processEvents() == "quit":
-                self.running = False
-            self.screen.fill((0, 0, 0))
-            self.colorfield.checkRunning()
-            self.colorfield.cycleColors()
-            self.colorfield.drawField(self.at_env.paper)
-            self.screen.blit(self.at_env.paper, self.at_env.paperpos)
-            pygame.display.flip()
+            self.handleInput()
+            self.update()
+            self.draw()
+            self.present()
+        self.close()
+
+    def handleInput(self):
+        if self.processEvents() == "quit":
+            self.running = False
+
+    def update(self):
+        self.colorfield.checkRunning()
+        self.colorfield.cycleColors()
+
+    def draw(self):
+        self.screen.fill((0, 0, 0))
+        self.colorfield.drawField(self.at_env.paper)
+        self.screen.blit(self.at_env.paper, self.at_env.paperpos)
+
+    def present(self):
+        pygame.display.flip()
 
+    def close(self):
         pygame.quit()
 
     def processEvents(self):
@@ -2,6 +2,7 @@
 # coding: utf-8
 
 import pygame
+import numpy as np
 from math import cos, sin
 import os, sys
 from inputhandler import InputHandler
@@ -33,123 +34,310 @@ from inputhandler import InputHandler
 """
 
 WINDOW_SIZE = (800, 600)
+FPS         = 50
 
 SHOW = ("cube", "pyramid", "coordinatesystem")
 
+# Number of ships shown with the option "fleet":
+FLEETSIZE = 1000
+
 if len(sys.argv) > 1 and "ship" in sys.argv[1]:
     SHOW = ("ship",)
 
+if len(sys.argv) > 1 and "fleet" in sys.argv[1]:
+    SHOW = ("fleet",)
+
+# With the option "hidden", only the lines of the faces turned towards the
+# viewer are drawn (for meshes, that have faces), like in the original Elite:
+HIDDENLINES = "hidden" in sys.argv[1:]
+
+class Transform:
+
+    """ The angles of an object. The rotation matrix is kept, and only
+        calculated again, after one of the angles has been changed. So objects,
+        that don't rotate, don't need any sin() or cos() in a frame. """
+
+    def __init__(self, angle_x, angle_y, angle_z):
+        self._angle_x = angle_x
+        self._angle_y = angle_y
+        self._angle_z = angle_z
+        self.rotation = None
+
+    @property
+    def angle_x(self):
+        return self._angle_x
+
+    @angle_x.setter
+    def angle_x(self, value):
+        if value != self._angle_x:
+            self._angle_x = value
+            self.rotation = None
+
+    @property
+    def angle_y(self):
+        return self._angle_y
+
+    @angle_y.setter
+    def angle_y(self, value):
+        if value != self._angle_y:
+            self._angle_y = value
+            self.rotation = None
+
+    @property
+    def angle_z(self):
+        return self._angle_z
+
+    @angle_z.setter
+    def angle_z(self, value):
+        if value != self._angle_z:
+            self._angle_z = value
+            self.rotation = None
+
+    def getRotationMatrix(self):
+        """ Rotation around x, then y, then z. """
+        if self.rotation is None:
+            cx, sx = cos(self._angle_x), sin(self._angle_x)
+            cy, sy = cos(self._angle_y), sin(self._angle_y)
+            cz, sz = cos(self._angle_z), sin(self._angle_z)
+            rotation_x = np.array(((1, 0, 0),
+                                   (0, cx, -sx),
+                                   (0, sx, cx)))
+            rotation_y = np.array(((cy, 0, sy),
+                                   (0, 1, 0),
+                                   (-sy, 0, cy)))
+            rotation_z = np.array(((cz, -sz, 0),
+                                   (sz, cz, 0),
+                                   (0, 0, 1)))
+            self.rotation = rotation_z @ rotation_y @ rotation_x
+        return self.rotation
+
+
+def getPolylines(connectdata):
+    """ Chains the lines into as few polylines as possible, so that every
+        line is drawn once. A connected part of the lines, in which 2 * k points
+        have an odd number of lines, needs at least k polylines (one, if there
+        are no such points). They are found as an Euler circuit through an
+        extra point, that is connected to all odd points, and then split up
+        at the extra point. """
+    extra     = None
+    adjacency = {}
+    lines     = list(connectdata)
+    for a, b in connectdata:
+        adjacency.setdefault(a, [])
+        adjacency.setdefault(b, [])
+    odd = [i for i in adjacency if sum(i in line for line in connectdata) % 2]
+    for i in odd:
+        lines.append((extra, i))
+    for n in range(len(lines)):
+        a, b = lines[n]
+        adjacency.setdefault(a, []).append((b, n))
+        adjacency.setdefault(b, []).append((a, n))
+    used     = [False] * len(lines)
+    position = dict.fromkeys(adjacency, 0)
+    polylines = []
+    # The circuit through the extra point first:
+    for start in ([extra] if odd else []) + list(adjacency.keys()):
+        # Hierholzer's algorithm:
+        stack   = [start]
+        circuit = []
+        while stack:
+            point = stack[-1]
+            while position[point] < len(adjacency[point]) and used[adjacency[point][position[point]][1]]:
+                position[point] += 1
+            if position[point] == len(adjacency[point]):
+                circuit.append(stack.pop())
+            else:
+                nextpoint, n = adjacency[point][position[point]]
+                used[n] = True
+                stack.append(nextpoint)
+        polyline = []
+        for point in circuit:
+            if point is extra:
+                if len(polyline) > 1:
+                    polylines.append(tuple(polyline))
+                polyline = []
+            else:
+                polyline.append(point)
+        if len(polyline) > 1:
+            polylines.append(tuple(polyline))
+    return tuple(polylines)
+
+DOTSPRITES = {}
+
+def getDotSprite(color, radius):
+    """ A circle on a small surface, made just once. """
+    if (color, radius) not in DOTSPRITES:
+        surface = pygame.Surface((2 * radius + 1, 2 * radius + 1))
+        surface = surface.convert()
+        surface.set_colorkey((0, 0, 0))
+        pygame.draw.circle(surface, color, (radius, radius), radius)
+        DOTSPRITES[(color, radius)] = surface
+    return DOTSPRITES[(color, radius)]
+
+
+class Mesh:
+
+    """ The points and lines of a model. It's shared by all polygons of the
+        same kind, so it must not be changed.
+        Optionally, there are faces, each given by its points in the order
+        around the face. Their normals are calculated here, pointing outwards.
+        "detaildata" are lines on faces, like the engines of the ship:
+        Tuples of (lines, numbers of the faces, on which they are seen). """
+
+    def __init__(self, pointdata, connectdata, facedata = (), detaildata = ()):
+        # The points as an array of shape (number of points, 3):
+        self.pointdata = np.array(pointdata, dtype = float)
+        self.pointdata.flags.writeable = False
+        self.connectdata = tuple(connectdata)
+        # The lines chained to polylines (tuples of point numbers):
+        self.polylines = getPolylines(self.connectdata)
+        self.facedata  = tuple(tuple(i) for i in facedata)
+        self.normals   = self.getNormals()
+        self.normals.flags.writeable = False
+        self.details   = tuple((tuple(lines), tuple(faces)) for lines, faces in detaildata)
+        # The parts seen for each combination of visible faces, see getVisibleParts():
+        self.visibleparts = {}
+
+    def getVisibleParts(self, visible):
+        """ Returns the polylines through the lines of the faces seen (and their
+            details), with lines between two of these faces only once, and the
+            numbers of the points of these faces. There are only a few
+            combinations of visible faces, so they're chained just once. """
+        key = tuple(visible)
+        if key not in self.visibleparts:
+            lines  = set()
+            points = set()
+            for face, seen in zip(self.facedata, key):
+                if seen:
+                    points.update(face)
+                    for n in range(len(face)):
+                        lines.add(tuple(sorted((face[n - 1], face[n]))))
+            for detaillines, facenumbers in self.details:
+                if any(key[i] for i in facenumbers):
+                    lines.update(tuple(sorted(i)) for i in detaillines)
+            self.visibleparts[key] = (getPolylines(sorted(lines)), sorted(points))
+        return self.visibleparts[key]
+
+    def getNormals(self):
+        normals = np.zeros((len(self.facedata), 3))
+        if not self.facedata:
+            return normals
+        middle = self.pointdata[sorted(set(sum(self.facedata, ())))].mean(axis = 0)
+        for n in range(len(self.facedata)):
+            face = self.pointdata[list(self.facedata[n])]
+            # Newell's method, also works, if some of the points are in a line:
+            normal = np.cross(face, np.roll(face, -1, axis = 0)).sum(axis = 0)
+            if normal @ (face.mean(axis = 0) - middle) < 0:
+                normal = -normal
+            normals[n] = normal / np.linalg.norm(normal)
+        return normals
+
+
+class MeshRegistry:
+
+    """ Keeps one Mesh for every kind of model. """
+
+    def __init__(self):
+        self.meshes = {}
+
+    def get(self, name, createmesh):
+        """ "createmesh" is only called, when there isn't a mesh of that name yet. """
+        if name not in self.meshes:
+            self.meshes[name] = createmesh()
+        return self.meshes[name]
+
+MESHES = MeshRegistry()
+
+
 class Polygon:
 
     def __init__(self, angle_x, angle_y, angle_z):
         self.scale   = 100
         self.rotate_speed = 0.03
-        self.angle_x = angle_x
-        self.angle_y = angle_y
-        self.angle_z = angle_z
-        self.projection_matrix = ((1, 0, 0),
-                                  (0, 1, 0),
-                                  (0, 0, 0))
-        self.pointdata = ()
-        self.connectdata = ()
+        self.linewidth = 2
+        self.transform = Transform(angle_x, angle_y, angle_z)
+        # Where the middle of the polygon is drawn on the screen:
+        self.position = (WINDOW_SIZE[0] / 2, WINDOW_SIZE[1] / 2)
+        self.projection_matrix = np.array(((1, 0, 0),
+                                           (0, 1, 0),
+                                           (0, 0, 0)), dtype = float)
+        self.mesh = None
 
     def printAngles(self):
-        print ("angle_x:    " + str(self.angle_x))
-        print ("angle_y:    " + str(self.angle_y))
-        print ("angle_z:    " + str(self.angle_z))
+        print ("angle_x:    " + str(self.transform.angle_x))
+        print ("angle_y:    " + str(self.transform.angle_y))
+        print ("angle_z:    " + str(self.transform.angle_z))
         print ()
 
-    def reformatPointData(self, a):
-        """ What we need is a matrix, with three rows and one column (= column-vector).
-            As tuples, it looks like this: "((2,), (5,), (3,))". """
-        b = []
-        for i in a:
-            c = []
-            for u in i:
-                d = [u]
-                c.append(d)
-            b.append(c)
-        return b
-
-    def multiply_m(self, a, b):
-        """ Input are two matrices. If a matrix is a vector (in this script typically b), it has
-            to be a column-vector, that is, it has to have several lines, but just one column.
-            Not a row-vector. """
-        a_rows = len(a)
-        a_cols = len(a[0])
-        b_rows = len(b)
-        b_cols = len(b[0])
-        if a_cols != b_rows:
-            print("INCOMPATIBLE MATRIX SIZES")
-            return
-        # Dot product matrix dimensions = a_rows x b_cols
-        product = []
-        for i in range(a_rows):
-            line = []
-            for u in range(b_cols):
-                n = 0
-                for u2 in range(b_rows):
-                    n += a[i][u2] * b[u2][u]
-                line.append(n)
-            product.append(line)
-        return product 
-
     def rotate(self, direction):
         if direction == "left":
-            self.angle_y += self.rotate_speed
+            self.transform.angle_y += self.rotate_speed
         if direction == "right":
-            self.angle_y -= self.rotate_speed
+            self.transform.angle_y -= self.rotate_speed
         if direction == "up":
-            self.angle_x += self.rotate_speed
+            self.transform.angle_x += self.rotate_speed
         if direction == "down":
-            self.angle_x -= self.rotate_speed
+            self.transform.angle_x -= self.rotate_speed
 
-    def draw(self, screen):
+    def getVisibleFaces(self, rotation):
+        """ The viewer looks along the z-axis (x to the right, y downwards on
+            the screen). So faces are turned towards the viewer, if the
+            z-component of their rotated normal is negative. """
+        if not HIDDENLINES or not self.mesh.facedata:
+            return None
+        return (self.mesh.normals @ rotation[2] < 0).tolist()
 
-        rotation_x = ((1, 0, 0),
-                      (0, cos(self.angle_x), -sin(self.angle_x)),
-                      (0, sin(self.angle_x), cos(self.angle_x)))
-        rotation_y = ((cos(self.angle_y), 0, sin(self.angle_y)),
-                      (0, 1, 0),
-                      (-sin(self.angle_y), 0, cos(self.angle_y)))
-        rotation_z = ((cos(self.angle_z), -sin(self.angle_z), 0),
-                      (sin(self.angle_z), cos(self.angle_z), 0),
-                      (0, 0, 1))
-
-        points = []
-        for point in self.pointdata:
-            rotate_x = self.multiply_m(rotation_x, point)
-            rotate_y = self.multiply_m(rotation_y, rotate_x)
-            rotate_z = self.multiply_m(rotation_z, rotate_y)
-            point_2d = self.multiply_m(self.projection_matrix, rotate_z)
-            x = int(point_2d[0][0] * self.scale + WINDOW_SIZE[0] / 2)
-            y = int(point_2d[1][0] * self.scale + WINDOW_SIZE[1] / 2)
-            points.append((x, y))
-            if self.name != "ship":
-                pygame.draw.circle(screen, (255, 0, 0), (x, y), 5)
+    def getMatrix(self):
+        """ The rotation, the projection and the scaling
+            put together in one matrix. """
+        return self.projection_matrix @ self.transform.getRotationMatrix() * self.scale
 
-        # Connect points:
-        for i in self.connectdata:
-            pygame.draw.line(screen, (255, 255, 255), (points[i[0]][0], points[i[0]][1]) , (points[i[1]][0], points[i[1]][1]), 2)
+    def draw(self, screen):
+
+        # All points in one multiplication. The rows of "pointdata" are the points,
+        # so they're multiplied with the transposed matrix from the right:
+        points_2d = self.mesh.pointdata @ self.getMatrix()[:2].T + self.position
+        self.drawPoints(screen, points_2d.astype(int).tolist(),
+                        self.getVisibleFaces(self.transform.getRotationMatrix()))
 
         # self.printAngles()
 
+    def drawPoints(self, screen, points, visible = None):
+        """ Draws the polygon with its points already on the screen.
+            "visible" says, which faces are seen, if there's hidden-line removal. """
+        if visible is None:
+            polylines = self.mesh.polylines
+            dots      = points
+        else:
+            polylines, pointnumbers = self.mesh.getVisibleParts(visible)
+            dots = [points[i] for i in pointnumbers]
+
+        if self.name != "ship":
+            dot = getDotSprite((255, 0, 0), 5)
+            screen.blits([(dot, (x - 5, y - 5)) for x, y in dots], doreturn = False)
+
+        # Connect points:
+        for i in polylines:
+            pygame.draw.lines(screen, (255, 255, 255), False, [points[u] for u in i], self.linewidth)
+
 
 class CoordinateSystem(Polygon):
 
     def __init__(self, name):
         Polygon.__init__(self, -2.92, 3.46, 0)
         self.name = name
-        l = 2
-        self.pointdata = ((-l, 0, 0),
-                          (l,  0, 0),
-                          (0, -l, 0),
-                          (0,  l, 0),
-                          (0, 0, -l),
-                          (0,  0, l))
-        self.pointdata = self.reformatPointData(self.pointdata)
+        self.mesh = MESHES.get("coordinatesystem", self.createMesh)
 
-        self.connectdata = ((0, 1), (2, 3), (4, 5))
+    def createMesh(self):
+        l = 2
+        pointdata = ((-l, 0, 0),
+                     (l,  0, 0),
+                     (0, -l, 0),
+                     (0,  l, 0),
+                     (0, 0, -l),
+                     (0,  0, l))
+        connectdata = ((0, 1), (2, 3), (4, 5))
+        return Mesh(pointdata, connectdata)
 
 
 class Cube(Polygon):
@@ -157,35 +345,44 @@ class Cube(Polygon):
     def __init__(self, name):
         Polygon.__init__(self, -2.92, 3.46, 0)
         self.name = name
+        self.mesh = MESHES.get("cube", self.createMesh)
+
+    def createMesh(self):
         l = 1
-        self.pointdata = ((-1, -1, 1),
-                          (1, -1, 1),
-                          (1, 1, 1),
-                          (-1, 1, 1),
-                          (-1, -1, -1),
-                          (1, -1, -1),
-                          (1, 1, -1),
-                          (-1, 1, -1))
-        self.pointdata = self.reformatPointData(self.pointdata)
-
-        self.connectdata = ((0, 1), (0, 3), (0, 4), (1, 2), (1, 5), (2, 6), (2, 3), (3, 7), 
-                            (4, 5), (4, 7), (6, 5), (6, 7)) 
+        pointdata = ((-1, -1, 1),
+                     (1, -1, 1),
+                     (1, 1, 1),
+                     (-1, 1, 1),
+                     (-1, -1, -1),
+                     (1, -1, -1),
+                     (1, 1, -1),
+                     (-1, 1, -1))
+        connectdata = ((0, 1), (0, 3), (0, 4), (1, 2), (1, 5), (2, 6), (2, 3), (3, 7), 
+                       (4, 5), (4, 7), (6, 5), (6, 7))
+        facedata = ((0, 1, 2, 3), (4, 5, 6, 7), (0, 1, 5, 4),
+                    (3, 2, 6, 7), (0, 3, 7, 4), (1, 2, 6, 5))
+        return Mesh(pointdata, connectdata, facedata)
+
 
 class Pyramid(Polygon):
 
     def __init__(self, name):
         Polygon.__init__(self, -2.92, 3.46, 0)
         self.name = name
+        self.mesh = MESHES.get("pyramid", self.createMesh)
+
+    def createMesh(self):
         l = 1
-        self.pointdata = ((l,  -l, -l),
-                          (l,  -l, l),
-                          (-l,  -l, -l),
-                          (-l,  -l, l),
-                          (0,  l, 0))
-        self.pointdata = self.reformatPointData(self.pointdata)
+        pointdata = ((l,  -l, -l),
+                     (l,  -l, l),
+                     (-l,  -l, -l),
+                     (-l,  -l, l),
+                     (0,  l, 0))
+        connectdata = ((0, 1), (2, 3), (0, 2), (1, 3),
+                       (0, 4), (1, 4), (2, 4), (3, 4))
+        facedata = ((0, 1, 3, 2), (0, 1, 4), (1, 3, 4), (3, 2, 4), (2, 0, 4))
+        return Mesh(pointdata, connectdata, facedata)
 
-        self.connectdata =((0, 1), (2, 3), (0, 2), (1, 3),
-                           (0, 4), (1, 4), (2, 4), (3, 4))
 
 class Ship(Polygon):
 
@@ -194,26 +391,39 @@ class Ship(Polygon):
         self.name = name
         self.scale = 1.7
         self.rotate_speed = 0.04
+        self.mesh = MESHES.get("ship", self.createMesh)
+
+    def createMesh(self):
         l = 1
-        self.pointdata = ((32, 0, 76), (-32, 0, 76), (0, 26, 24), (-120, -3, -8),
-                          (120, -3, -8), (-88, 16, -40), (88, 16, -40), (128, -8, -40),
-                          (-128, -8, -40), (0, 26, -40), (-32, -24, -40), (32, -24, -40),
-                          (-36, 8, -40), (-8, 12, -40), (8, 12, -40), (36, 8, -40),
-                          (36, -12, -40), (8, -16, -40), (-8, -16, -40), (-36, -12, -40),
-                          (0, 0, 76), (0, 0, 90), (-80, -6, -40), (-80, 6, -40),
-                          (-88, 0, -40), (80, 6, -40), (88, 0, -40), (80, -6, -40))
-        self.pointdata = self.reformatPointData(self.pointdata)
-
-        self.connectdata =((1, 2), (2, 0), (0, 20), (20, 1),
-                           (1, 5), (5, 2), (6, 0), (2, 6),
-                           (1, 3), (3, 5), (4, 0), (6, 4),
-                           (5, 9), (9, 2), (9, 6), (3, 8),
-                           (8, 5), (7, 4), (6, 7), (8, 10),
-                           (10, 11), (11, 8), (1, 10), (0, 11),
-                           (7, 11), (18, 13), (13, 12), (12, 19),
-                           (19, 18), (17, 16), (16, 15), (15, 14),
-                           (14, 17), (22, 23), (23, 24), (24, 22),
-                           (27, 26), (26, 25), (25, 27), (20, 21))
+        pointdata = ((32, 0, 76), (-32, 0, 76), (0, 26, 24), (-120, -3, -8),
+                     (120, -3, -8), (-88, 16, -40), (88, 16, -40), (128, -8, -40),
+                     (-128, -8, -40), (0, 26, -40), (-32, -24, -40), (32, -24, -40),
+                     (-36, 8, -40), (-8, 12, -40), (8, 12, -40), (36, 8, -40),
+                     (36, -12, -40), (8, -16, -40), (-8, -16, -40), (-36, -12, -40),
+                     (0, 0, 76), (0, 0, 90), (-80, -6, -40), (-80, 6, -40),
+                     (-88, 0, -40), (80, 6, -40), (88, 0, -40), (80, -6, -40))
+        connectdata = ((1, 2), (2, 0), (0, 20), (20, 1),
+                       (1, 5), (5, 2), (6, 0), (2, 6),
+                       (1, 3), (3, 5), (4, 0), (6, 4),
+                       (5, 9), (9, 2), (9, 6), (3, 8),
+                       (8, 5), (7, 4), (6, 7), (8, 10),
+                       (10, 11), (11, 8), (1, 10), (0, 11),
+                       (7, 11), (18, 13), (13, 12), (12, 19),
+                       (19, 18), (17, 16), (16, 15), (15, 14),
+                       (14, 17), (22, 23), (23, 24), (24, 22),
+                       (27, 26), (26, 25), (25, 27), (20, 21))
+        # The hull. Face 12 is the back with the engines:
+        facedata = ((0, 2, 1, 20), (1, 2, 5), (0, 6, 2), (1, 5, 3), (0, 4, 6),
+                    (2, 5, 9), (2, 9, 6), (3, 8, 5), (4, 6, 7), (1, 3, 8, 10),
+                    (0, 11, 7, 4), (0, 20, 1, 10, 11), (5, 9, 6, 7, 11, 10, 8))
+        detaildata = ((((8, 11),
+                        (18, 13), (13, 12), (12, 19), (19, 18),
+                        (17, 16), (16, 15), (15, 14), (14, 17),
+                        (22, 23), (23, 24), (24, 22),
+                        (27, 26), (26, 25), (25, 27)), (12,)),
+                      # The gun at the nose:
+                      (((20, 21),), (0, 11)))
+        return Mesh(pointdata, connectdata, facedata, detaildata)
 
 
 class PolygonGroup:
@@ -232,13 +442,35 @@ class PolygonGroup:
             i.rotate(direction)
 
     def draw(self, screen):
+        """ The points of all polygons with the same mesh are transformed
+            together, in one operation. """
+        meshes = {}
         for i in self.group:
-            i.draw(screen)
+            meshes.setdefault(id(i.mesh), []).append(i)
+        for polygons in meshes.values():
+            if len(polygons) == 1:
+                polygons[0].draw(screen)
+                continue
+            rotations = np.array([i.transform.getRotationMatrix() for i in polygons])
+            scales    = np.array([i.scale for i in polygons])
+            positions = np.array([i.position for i in polygons])
+            # Like getMatrix(), for all polygons, shape (polygons, 2, 3). They all
+            # have the same projection:
+            matrices  = polygons[0].projection_matrix[:2] @ rotations * scales[:, np.newaxis, np.newaxis]
+            # Shape (polygons, points, 2):
+            points_2d = polygons[0].mesh.pointdata @ matrices.transpose(0, 2, 1) + positions[:, np.newaxis, :]
+            points_2d = points_2d.astype(int).tolist()
+            # The backface test for all polygons, shape (polygons, faces):
+            visible = [None] * len(polygons)
+            if HIDDENLINES and polygons[0].mesh.facedata:
+                visible = (rotations[:, 2, :] @ polygons[0].mesh.normals.T < 0).tolist()
+            for i in range(len(polygons)):
+                polygons[i].drawPoints(screen, points_2d[i], visible[i])
 
 
 class Main:
 
-    def __init__(self):
+    def __init__(self, mainloop = True):
         os.environ['SDL_VIDEO_WINDOW_POS'] = "185, 30"
         pygame.init()
         self.screen = pygame.display.set_mode(WINDOW_SIZE)
@@ -246,18 +478,43 @@ class Main:
         self.ih = InputHandler(True)
         self.initPolygons()
         self.clock = pygame.time.Clock()
+        self.clocktick = 0
+        self.action = {}
         self.running = True
-        while self.running:
-            self.clock.tick(50)
-            self.screen.fill((0, 0, 0))
-
-            self.pggroup.draw(self.screen)
+        if mainloop:
+            self.mainLoop()
 
-            if self.checkInput() == "quit":
+    def mainLoop(self):
+        # A frame is split into these steps, so that it can also be driven
+        # from outside (see "benchmark/benchmark.py"):
+        while self.running:
+            self.clocktick = self.clock.tick(FPS)
+            self.handleInput()
+            if not self.running:
                 print("Bye.")
-                self.running = False
                 continue
-            pygame.display.flip()
+            self.update()
+            self.draw()
+            self.present()
+        self.close()
+
+    def handleInput(self):
+        if self.checkInput() == "quit":
+            self.running = False
+
+    def update(self):
+        for i in self.action.keys():
+            if self.action[i]:
+                self.pggroup.rotate(i)
+
+    def draw(self):
+        self.screen.fill((0, 0, 0))
+        self.pggroup.draw(self.screen)
+
+    def present(self):
+        pygame.display.flip()
+
+    def close(self):
         pygame.quit()
 
     def initPolygons(self):
@@ -270,16 +527,29 @@ class Main:
             self.pggroup.add(Cube("cube"))
         if "ship" in SHOW:
             self.pggroup.add(Ship("ship"))
+        if "fleet" in SHOW:
+            self.initFleet()
+
+    def initFleet(self):
+        # Small ships in rows, each turned a bit differently:
+        columns = 40
+        rows    = -(-FLEETSIZE // columns)
+        for i in range(FLEETSIZE):
+            ship = Ship("ship")
+            ship.scale = 0.1
+            ship.linewidth = 1
+            ship.position = ((i % columns + 0.5) * WINDOW_SIZE[0] / columns,
+                             (i // columns + 0.5) * WINDOW_SIZE[1] / rows)
+            ship.transform.angle_y += i * 0.05
+            ship.transform.angle_x += i * 0.013
+            self.pggroup.add(ship)
 
     def checkInput(self):
         # "action" is a dictionary with the keys "left right up down fire quit":
-        action = self.ih.getKeyboardAndJoystickAction()
-        for i in action.keys():
-            if i == "quit" and action[i]:
-                pygame.quit()
-                return "quit"
-            if action[i]:
-                self.pggroup.rotate(i)
+        self.action = self.ih.getKeyboardAndJoystickAction()
+        if self.action["quit"]:
+            return "quit"
         return 0
 
-Main()
+if __name__ == "__main__":
+    Main()
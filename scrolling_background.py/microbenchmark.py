@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+"""
+    microbenchmark.py - Measures, how long Map.draw() and
+                        Player.setDrawCoordinates() of scrolling_background.py
+                        take per frame, with the different map renderers and
+                        at several map sizes.
+
+    Copyright (C) 2021 hlubenow
+
+    This program is free software: you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import scrolling_background as sb
+
+RENDERERS = ("surface", "chunks", "threaded", "tiles", "ring", "parallax")
+# In map parts of 9x9 tiles:
+MAPSIZES  = ((3, 3), (10, 10), (112, 112))
+
+def measure(renderer, mapparts, frames):
+    """ Lets the player walk diagonally through the map and back. Returns the
+        time of createSurface() in ms, and the mean times of Map.draw() and
+        Player.setDrawCoordinates() per frame in microseconds. """
+    screenborder = (100 * sb.SCALEFACTOR, 50 * sb.SCALEFACTOR)
+    scroller = sb.Scroller((screenborder[0] // 2, screenborder[1] // 2), renderer, mapparts = mapparts)
+    screen   = pygame.display.set_mode((screenborder[0] + scroller.map.mappartwidth,
+                                        screenborder[1] + scroller.map.mappartheight))
+    player   = sb.Player(scroller.map, screenborder)
+    start    = time.perf_counter()
+    scroller.start(player.x, player.y)
+    createtime = time.perf_counter() - start
+    drawtime   = 0
+    coordtime  = 0
+    dt = 1 / sb.FPS
+    for frame in range(frames):
+        if frame % 200 < 100:
+            directions = ("right", "down")
+        else:
+            directions = ("left", "up")
+        for i in directions:
+            player.move(i, dt)
+        scroller.update(player.x, player.y, dt)
+        start = time.perf_counter()
+        player.setDrawCoordinates()
+        coordtime += time.perf_counter() - start
+        start = time.perf_counter()
+        scroller.draw(screen)
+        drawtime += time.perf_counter() - start
+    scroller.close()
+    return (createtime * 1000, drawtime / frames * 1000000, coordtime / frames * 1000000)
+
+def main():
+    parser = argparse.ArgumentParser(description = "Measures Map.draw() and Player.setDrawCoordinates() of scrolling_background.py.")
+    parser.add_argument("renderers", nargs = "*", default = list(RENDERERS), help = "map renderers (default: all)")
+    parser.add_argument("--frames", type = int, default = 500, help = "number of frames per measurement")
+    args = parser.parse_args()
+    pygame.init()
+    print("%-10s %-10s %14s %14s %18s" % ("RENDERER", "MAPPARTS", "CREATE (ms)", "DRAW (us)", "SETDRAWCOORD (us)"))
+    for renderer in args.renderers:
+        for mapparts in MAPSIZES:
+            size = "%dx%d" % mapparts
+            if renderer == "surface" and max(mapparts) * 9 * sb.TILESIZE * sb.SCALEFACTOR > sb.MAX_SURFACESIZE:
+                print("%-10s %-10s %14s" % (renderer, size, "too large"))
+                continue
+            print("%-10s %-10s %14.2f %14.1f %18.2f" % ((renderer, size) + measure(renderer, mapparts, args.frames)))
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
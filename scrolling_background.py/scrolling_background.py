@@ -1,4 +1,4 @@
-#!/usr/bin/python
+#!/usr/bin/python3
 # coding: utf-8
 
 """
@@ -23,7 +23,14 @@
 
 import pygame
 
-import os
+import os, sys
+import math
+import random
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import tilemapfile
 
 SCALEFACTOR = 2
 TILESIZE    = 25
@@ -35,6 +42,68 @@ else:
 
 FPS = 50
 
+# Speed of the player in pixels per second (before SCALEFACTOR):
+PLAYERSPEED = 150
+# If a frame took longer than that (seconds), the game slows down instead
+# of making a big jump:
+MAX_FRAMETIME = 0.1
+
+# How the camera follows the player:
+# "lock":     The player stays in the middle of the viewport (until the
+#             end of the map is reached).
+# "ease":     The camera catches up with the player smoothly. After
+#             CAMERA_EASING seconds, it has made about 2/3 of the way.
+# "deadzone": The camera only moves, when the player leaves the area of
+#             DEADZONE pixels in the middle of the viewport.
+CAMERA        = "lock"
+CAMERA_EASING = 0.25
+DEADZONE      = (100 * SCALEFACTOR, 60 * SCALEFACTOR)
+
+# Size of the map in map parts of 9x9 tiles:
+MAPPARTS = (3, 3)
+
+# "surface": The whole map is drawn onto one large surface at the start.
+# "chunks":  Only the map parts around the viewport are drawn, when they're
+#            needed, and the last CHUNKCACHE_SIZE of them are kept. So the
+#            memory needed doesn't depend on the size of the map.
+# "tiles":   The map is a grid of tile ids. Every frame, just the tiles in the
+#            viewport are blitted from a TileAtlas.
+# "ring":    The tiles are drawn onto a buffer, that is one tile larger than
+#            the viewport and wraps around at its edges. When scrolling, just
+#            the tile rows and columns coming into view are drawn, and the
+#            viewport is blitted from the buffer in up to four parts.
+# "threaded": Like "chunks", but the chunks are drawn by CHUNKTHREADS threads in
+#            the background. Until a chunk is ready, a placeholder is shown.
+# "parallax": Several layers, that scroll at different speeds. The grey tiles
+#            of the map are transparent, so the layers behind can be seen.
+MAPRENDERER    = "surface"
+CHUNKCACHE_SIZE = 9
+
+# The largest map, that "surface" draws (pixels on each side). Larger maps are
+# drawn by "chunks" instead:
+MAX_SURFACESIZE = 16384
+CHUNKTHREADS    = 2
+
+# A map file made by "tilemapfile.py" (given as an argument ending with
+# ".tmap"). It's drawn by the renderers "tiles" or "ring":
+MAPFILE = None
+
+# Chunks of the parallax layers are this large (pixels):
+PARALLAX_CHUNKSIZE = 75 * SCALEFACTOR
+# When the layers are put together, the viewport is divided into cells of this
+# size. Areas of the layers behind, whose cells are all covered, aren't drawn:
+COVERCELLSIZE = 25 * SCALEFACTOR
+
+# Number of objects spread over the map (the player collects them). They're
+# kept in a SpatialGrid with cells of GRIDCELLSIZE pixels, so only the ones
+# in the viewport have to be looked at:
+ENTITIES     = 0
+ENTITYSIZE   = 4 * SCALEFACTOR
+GRIDCELLSIZE = 50 * SCALEFACTOR
+
+# Number of rendered texts kept by the TextCache:
+TEXTCACHE_SIZE = 256
+
 COLORS = {"black"      : (0, 0, 0),
           "darkgrey"   : (76, 76, 76),
           "grey"       : (140, 140, 140),
@@ -43,23 +112,89 @@ COLORS = {"black"      : (0, 0, 0),
           "blue"       : (0, 0, 200),
           "darkblue"   : (0, 0, 150)}
 
+# Colors of the tile ids (as many as tilemapfile.NROFTILES):
+TILECOLORS = ("lightgrey", "grey", "darkgrey", "red")
+
+def configure(args):
+    """ Sets the options from the command line. It's called by Main, so that
+        other programs can import this script without side effects. """
+    global MAPRENDERER, CAMERA, MAPFILE, ENTITIES, MAPPARTS
+    for arg in args:
+        if arg in ("surface", "chunks", "threaded", "tiles", "ring", "parallax"):
+            MAPRENDERER = arg
+        if arg in ("lock", "ease", "deadzone"):
+            CAMERA = arg
+        if arg.endswith(".tmap"):
+            MAPFILE = arg
+        if arg == "entities":
+            ENTITIES = 10000
+        # A map of 1008x1008 tiles:
+        if arg == "huge":
+            MAPPARTS = (112, 112)
+    if MAPFILE and MAPRENDERER not in ("tiles", "ring"):
+        MAPRENDERER = "tiles"
+    if MAPRENDERER == "surface" and max(MAPPARTS) * 9 * TILESIZE * SCALEFACTOR > MAX_SURFACESIZE:
+        MAPRENDERER = "chunks"
+
+class TextCache:
+
+    """ pygame.font.SysFont() searches the font directories every time it's
+        called, which can take long on systems with many fonts. So the fonts
+        are made just once, and the last "size" rendered texts are kept. """
+
+    def __init__(self, size):
+        self.size  = size
+        self.fonts = {}
+        self.texts = OrderedDict()
+
+    def getFont(self, fontname, fontsize):
+        key = (fontname, fontsize)
+        if key not in self.fonts:
+            self.fonts[key] = pygame.font.SysFont(fontname, fontsize)
+        return self.fonts[key]
+
+    def render(self, fontname, fontsize, text, color):
+        key = (fontname, fontsize, text, color)
+        if key in self.texts:
+            self.texts.move_to_end(key)
+        else:
+            self.texts[key] = self.getFont(fontname, fontsize).render(text, True, color)
+            if len(self.texts) > self.size:
+                self.texts.popitem(last = False)
+        return self.texts[key]
+
+    def clear(self):
+        # The fonts don't survive pygame.quit():
+        self.fonts.clear()
+        self.texts.clear()
+
+TEXTCACHE = TextCache(TEXTCACHE_SIZE)
+
+
 class Map:
 
-    def __init__(self, screenborder):
+    def __init__(self, screenborder, mapparts = (3, 3), tilemapsize = None):
         self.screenborder       = screenborder
         self.tilespermappart    = 9
-        self.mappartsx          = 3
-        self.mappartsy          = 3
-        self.tilemapsize        = (self.tilespermappart * self.mappartsx,
+        if tilemapsize is None:
+            self.mappartsx      = mapparts[0]
+            self.mappartsy      = mapparts[1]
+            self.tilemapsize    = (self.tilespermappart * self.mappartsx,
                                    self.tilespermappart * self.mappartsy)
+        else:
+            # The last map parts may be cut off:
+            self.tilemapsize    = tilemapsize
+            self.mappartsx      = -(-tilemapsize[0] // self.tilespermappart)
+            self.mappartsy      = -(-tilemapsize[1] // self.tilespermappart)
         self.mappartwidth       = self.tilespermappart * TILESIZE * SCALEFACTOR
         self.mappartheight      = self.tilespermappart * TILESIZE * SCALEFACTOR
         self.mappart_halfwidth  = self.mappartwidth // 2
         self.mappart_halfheight = self.mappartheight // 2
-        self.mapwidth           = self.mappartsx * self.mappartwidth 
-        self.mapheight          = self.mappartsy * self.mappartheight
-        self.lastpart_x         = self.mapwidth - self.mappartwidth
-        self.lastpart_y         = self.mapheight - self.mappartheight
+        self.mapwidth           = self.tilemapsize[0] * TILESIZE * SCALEFACTOR
+        self.mapheight          = self.tilemapsize[1] * TILESIZE * SCALEFACTOR
+        # Maps smaller than the viewport can't be scrolled:
+        self.lastpart_x         = max(0, self.mapwidth - self.mappartwidth)
+        self.lastpart_y         = max(0, self.mapheight - self.mappartheight)
 
     def createSurface(self):
         self.surface = pygame.Surface((self.mapwidth, self.mapheight))
@@ -76,6 +211,12 @@ class Map:
     def getMapPartSurface(self, mappartnumber):
         surface = pygame.Surface((self.mappartwidth, self.mappartheight))
         surface = surface.convert()
+        self.drawMapPartTiles(surface)
+        self.drawMapPartNumber(surface, mappartnumber)
+        return surface
+
+    def drawMapPartTiles(self, surface):
+        # Doesn't use fonts or the display, so it can also run in other threads.
         cnum = 1
         for y in range(self.tilespermappart):
             for x in range(self.tilespermappart):
@@ -90,23 +231,610 @@ class Map:
                                              TILESIZE * SCALEFACTOR - SCALEFACTOR,
                                              TILESIZE * SCALEFACTOR - SCALEFACTOR))
                 cnum = 1 - cnum
-                if x == 0 and y == 0:
-                    font = pygame.font.SysFont(FONTNAME, 32) 
-                    textsurface = font.render(str(mappartnumber), True, COLORS["red"])
-                    textrect      = textsurface.get_rect()
-                    textrect.topleft = (TILESIZE // 2 * SCALEFACTOR - textrect.width // 2,
-                                        TILESIZE // 2 * SCALEFACTOR - textrect.width)
-                    surface.blit(textsurface, textrect)
-        return surface
 
-    def move(self, player):
-        self.rect.topleft = (player.x - player.drawx, player.y - player.drawy)
+    def drawMapPartNumber(self, surface, mappartnumber):
+        textsurface = TEXTCACHE.render(FONTNAME, 32, str(mappartnumber), COLORS["red"])
+        textrect      = textsurface.get_rect()
+        textrect.topleft = (TILESIZE // 2 * SCALEFACTOR - textrect.width // 2,
+                            TILESIZE // 2 * SCALEFACTOR - textrect.width)
+        surface.blit(textsurface, textrect)
+
+    def move(self, camera):
+        self.rect.topleft = camera.getOffset()
+
+    def close(self):
+        pass
 
     def draw(self, surface):
         # Most important line for scrolling background:
         surface.blit(self.surface, (self.screenborder[0] // 2, self.screenborder[1] // 2), self.rect)
 
 
+class ChunkCache:
+
+    """ Keeps the last "size" chunks, that were asked for. A chunk, that isn't
+        there, is made by calling "render" with its key. If the cache is full,
+        the chunk, that wasn't used for the longest time, is thrown away. """
+
+    def __init__(self, size, render):
+        self.size   = size
+        self.render = render
+        self.chunks = OrderedDict()
+
+    def get(self, key):
+        chunk = self.find(key)
+        if chunk is None:
+            chunk = self.render(key)
+            self.put(key, chunk)
+        return chunk
+
+    def __contains__(self, key):
+        return key in self.chunks
+
+    def find(self, key):
+        """ Like get(), but returns None, if the chunk isn't there. """
+        if key not in self.chunks:
+            return None
+        self.chunks.move_to_end(key)
+        return self.chunks[key]
+
+    def put(self, key, chunk):
+        self.chunks[key] = chunk
+        self.chunks.move_to_end(key)
+        if len(self.chunks) > self.size:
+            self.chunks.popitem(last = False)
+
+
+class ChunkedMap(Map):
+
+    """ Doesn't draw the whole map in advance, but just the map parts
+        (chunks), that are seen in the viewport, and keeps them in a cache. """
+
+    def createSurface(self):
+        self.rect   = pygame.Rect(0, 0, self.mappartwidth, self.mappartheight)
+        self.chunks = ChunkCache(CHUNKCACHE_SIZE, self.renderChunk)
+
+    def renderChunk(self, key):
+        x, y = key
+        return self.getMapPartSurface(y * self.mappartsx + x + 1)
+
+    def getChunk(self, key):
+        return self.chunks.get(key)
+
+    def draw(self, surface):
+        # The viewport touches at most 2x2 chunks:
+        for y in range(self.rect.top // self.mappartheight, (self.rect.bottom - 1) // self.mappartheight + 1):
+            for x in range(self.rect.left // self.mappartwidth, (self.rect.right - 1) // self.mappartwidth + 1):
+                if x < 0 or y < 0 or x >= self.mappartsx or y >= self.mappartsy:
+                    continue
+                chunkrect = pygame.Rect(x * self.mappartwidth, y * self.mappartheight,
+                                        self.mappartwidth, self.mappartheight)
+                area = self.rect.clip(chunkrect)
+                position = (self.screenborder[0] // 2 + area.left - self.rect.left,
+                            self.screenborder[1] // 2 + area.top - self.rect.top)
+                surface.blit(self.getChunk((x, y)), position, area.move(-chunkrect.left, -chunkrect.top))
+
+
+class ThreadedChunkedMap(ChunkedMap):
+
+    """ The chunks are drawn by a pool of threads onto plain surfaces. The main
+        thread collects the finished ones at the start of a frame, converts
+        them to the format of the screen and adds the numbers (fonts are only
+        used by the main thread). Until then, a placeholder is shown. So the
+        first frame is shown at once, and the chunks are drawn while the
+        game goes on. """
+
+    def createSurface(self):
+        ChunkedMap.createSurface(self)
+        self.executor    = ThreadPoolExecutor(CHUNKTHREADS)
+        self.pending     = {}
+        self.placeholder = pygame.Surface((self.mappartwidth, self.mappartheight))
+        self.placeholder = self.placeholder.convert()
+        self.placeholder.fill(COLORS["darkgrey"])
+
+    def renderChunkPixels(self, key):
+        # Runs in a worker thread:
+        surface = pygame.Surface((self.mappartwidth, self.mappartheight))
+        self.drawMapPartTiles(surface)
+        return surface
+
+    def getNeighbourhood(self):
+        """ The chunk in the middle of the viewport and the ones around it.
+            The viewport is always inside of them. """
+        x = self.rect.centerx // self.mappartwidth
+        y = self.rect.centery // self.mappartheight
+        return [(i, j) for j in range(y - 1, y + 2) for i in range(x - 1, x + 2)
+                if i >= 0 and j >= 0 and i < self.mappartsx and j < self.mappartsy]
+
+    def collectChunks(self, neighbourhood):
+        for key in list(self.pending.keys()):
+            if not self.pending[key].done():
+                continue
+            surface = self.pending.pop(key).result()
+            # The viewport may have moved away in the meantime:
+            if key not in neighbourhood:
+                continue
+            surface = surface.convert()
+            self.drawMapPartNumber(surface, key[1] * self.mappartsx + key[0] + 1)
+            self.chunks.put(key, surface)
+
+    def requestChunks(self, neighbourhood):
+        for key in neighbourhood:
+            if key not in self.chunks and key not in self.pending:
+                self.pending[key] = self.executor.submit(self.renderChunkPixels, key)
+
+    def getChunk(self, key):
+        chunk = self.chunks.find(key)
+        if chunk is None:
+            return self.placeholder
+        return chunk
+
+    def draw(self, surface):
+        neighbourhood = self.getNeighbourhood()
+        self.collectChunks(neighbourhood)
+        self.requestChunks(neighbourhood)
+        ChunkedMap.draw(self, surface)
+
+    def close(self):
+        self.executor.shutdown(wait = True, cancel_futures = True)
+
+
+class TileMap:
+
+    """ The map as a grid of tile ids, one byte per tile, row after row. """
+
+    def __init__(self, width, height):
+        self.width  = width
+        self.height = height
+        self.tiles  = array("B", bytes(width * height))
+
+    def getTile(self, x, y):
+        return self.tiles[y * self.width + x]
+
+    def getRow(self, y, left, right):
+        return self.tiles[y * self.width + left : y * self.width + right]
+
+    def setTile(self, x, y, tileid):
+        self.tiles[y * self.width + x] = tileid
+
+    def fillCheckerboard(self, tilespermappart):
+        """ The pattern of getMapPartSurface(): It starts again
+            in every map part. """
+        for y in range(self.height):
+            row = y % tilespermappart
+            self.tiles[y * self.width : (y + 1) * self.width] = array("B", ((x % tilespermappart + row) % 2 for x in range(self.width)))
+
+
+class TileAtlas:
+
+    """ A prerendered surface for every tile id. """
+
+    def __init__(self, colornames):
+        self.tilesize = TILESIZE * SCALEFACTOR
+        self.surfaces = []
+        for i in colornames:
+            surface = pygame.Surface((self.tilesize, self.tilesize))
+            surface = surface.convert()
+            surface.fill(COLORS["black"])
+            surface.fill(COLORS[i], pygame.Rect(1, 1, self.tilesize - SCALEFACTOR, self.tilesize - SCALEFACTOR))
+            self.surfaces.append(surface)
+
+
+class TiledMap(Map):
+
+    """ Draws the tiles in the viewport from a TileMap and a TileAtlas
+        each frame, so that there isn't a surface of the whole map.
+        With "mapfile", the tile map is read from that file, and "mapparts"
+        isn't used. """
+
+    def __init__(self, screenborder, mapparts = (3, 3), mapfile = None):
+        self.mapfile = mapfile
+        self.tilemap = None
+        tilemapsize  = None
+        if mapfile:
+            self.tilemap = tilemapfile.MappedTileMap(mapfile, len(TILECOLORS))
+            tilemapsize  = (self.tilemap.width, self.tilemap.height)
+        Map.__init__(self, screenborder, mapparts, tilemapsize)
+        # Only the generated map has numbered map parts:
+        self.numbered = mapfile is None
+
+    def createSurface(self):
+        self.rect    = pygame.Rect(0, 0, self.mappartwidth, self.mappartheight)
+        if self.tilemap is None:
+            self.tilemap = TileMap(self.tilemapsize[0], self.tilemapsize[1])
+            self.tilemap.fillCheckerboard(self.tilespermappart)
+        self.atlas   = TileAtlas(TILECOLORS)
+
+    def draw(self, surface):
+        tilesize = self.atlas.tilesize
+        left     = self.screenborder[0] // 2 - self.rect.left
+        top      = self.screenborder[1] // 2 - self.rect.top
+        blits    = []
+        # Outside of the map, the background is left as it is:
+        tileleft  = max(0, self.rect.left // tilesize)
+        tileright = min(self.tilemap.width, (self.rect.right - 1) // tilesize + 1)
+        for y in range(max(0, self.rect.top // tilesize), min(self.tilemap.height, (self.rect.bottom - 1) // tilesize + 1)):
+            row = self.tilemap.getRow(y, tileleft, tileright)
+            for x in range(tileleft, tileright):
+                blits.append((self.atlas.surfaces[row[x - tileleft]],
+                              (left + x * tilesize, top + y * tilesize)))
+                if self.numbered and x % self.tilespermappart == 0 and y % self.tilespermappart == 0:
+                    blits.append(self.getMapPartNumber(x, y, left, top))
+        # The tiles at the edges stick out of the viewport:
+        clip = surface.get_clip()
+        surface.set_clip(pygame.Rect(self.screenborder[0] // 2, self.screenborder[1] // 2,
+                                     self.rect.width, self.rect.height))
+        surface.blits(blits, doreturn = False)
+        surface.set_clip(clip)
+
+    def close(self):
+        if self.mapfile:
+            self.tilemap.close()
+
+    def getMapPartNumber(self, x, y, left, top):
+        mappartnumber = y // self.tilespermappart * self.mappartsx + x // self.tilespermappart + 1
+        textsurface   = TEXTCACHE.render(FONTNAME, 32, str(mappartnumber), COLORS["red"])
+        textrect      = textsurface.get_rect()
+        textrect.topleft = (left + x * self.atlas.tilesize + TILESIZE // 2 * SCALEFACTOR - textrect.width // 2,
+                            top + y * self.atlas.tilesize + TILESIZE // 2 * SCALEFACTOR - textrect.width)
+        return (textsurface, textrect)
+
+
+class RingBufferMap(TiledMap):
+
+    """ Tile (x, y) of the map is always drawn at the same place in the buffer,
+        at (x % width, y % height) in tiles. "self.window" is the tile at the
+        topleft of the part of the map, that's in the buffer at the moment. """
+
+    def createSurface(self):
+        TiledMap.createSurface(self)
+        tilesize = self.atlas.tilesize
+        self.buffertiles = (-(-self.rect.width // tilesize) + 1,
+                            -(-self.rect.height // tilesize) + 1)
+        self.buffer = pygame.Surface((self.buffertiles[0] * tilesize, self.buffertiles[1] * tilesize))
+        self.buffer = self.buffer.convert()
+        self.window = None
+
+    def renderTile(self, x, y):
+        tilesize = self.atlas.tilesize
+        tilerect = pygame.Rect((x % self.buffertiles[0]) * tilesize, (y % self.buffertiles[1]) * tilesize,
+                               tilesize, tilesize)
+        if x < 0 or y < 0 or x >= self.tilemap.width or y >= self.tilemap.height:
+            self.buffer.fill(COLORS["darkblue"], tilerect)
+            return
+        self.buffer.blit(self.atlas.surfaces[self.tilemap.getTile(x, y)], tilerect)
+        if self.numbered and x % self.tilespermappart == 0 and y % self.tilespermappart == 0:
+            self.buffer.set_clip(tilerect)
+            self.buffer.blit(*self.getMapPartNumber(x, y, tilerect.left - x * tilesize, tilerect.top - y * tilesize))
+            self.buffer.set_clip(None)
+
+    def scroll(self):
+        bufferwidth, bufferheight = self.buffertiles
+        x = self.rect.left // self.atlas.tilesize
+        y = self.rect.top // self.atlas.tilesize
+        if self.window is None or abs(x - self.window[0]) >= bufferwidth or abs(y - self.window[1]) >= bufferheight:
+            columns = range(x, x + bufferwidth)
+            rows    = ()
+        else:
+            oldx, oldy = self.window
+            if x > oldx:
+                columns = range(oldx + bufferwidth, x + bufferwidth)
+            else:
+                columns = range(x, oldx)
+            if y > oldy:
+                rows = range(oldy + bufferheight, y + bufferheight)
+            else:
+                rows = range(y, oldy)
+        # New columns over the whole height, new rows over the whole width:
+        for tx in columns:
+            for ty in range(y, y + bufferheight):
+                self.renderTile(tx, ty)
+        for ty in rows:
+            for tx in range(x, x + bufferwidth):
+                self.renderTile(tx, ty)
+        self.window = (x, y)
+
+    def draw(self, surface):
+        self.scroll()
+        bufferwidth, bufferheight = self.buffer.get_size()
+        left   = self.rect.left % bufferwidth
+        top    = self.rect.top % bufferheight
+        width  = min(self.rect.width, bufferwidth - left)
+        height = min(self.rect.height, bufferheight - top)
+        x = self.screenborder[0] // 2
+        y = self.screenborder[1] // 2
+        surface.blit(self.buffer, (x, y), (left, top, width, height))
+        # Where the viewport wraps around the edges of the buffer:
+        if width < self.rect.width:
+            surface.blit(self.buffer, (x + width, y), (0, top, self.rect.width - width, height))
+        if height < self.rect.height:
+            surface.blit(self.buffer, (x, y + height), (left, 0, width, self.rect.height - height))
+        if width < self.rect.width and height < self.rect.height:
+            surface.blit(self.buffer, (x + width, y + height), (0, 0, self.rect.width - width, self.rect.height - height))
+
+
+class ParallaxLayer:
+
+    """ A layer, that scrolls "factor" times as fast as the map. It's made of
+        chunks of "chunksize" pixels, that are drawn by "render" (called with
+        the position of the chunk), when they're needed. Where a chunk has
+        the color "colorkey", it's transparent. Translucent layers get an
+        "alpha" value. Each chunk is checked once, if it's opaque or fully
+        transparent. Transparent chunks aren't kept at all. """
+
+    def __init__(self, factor, chunksize, render, cachesize, colorkey = None, alpha = None):
+        self.factor    = factor
+        self.chunksize = chunksize
+        self.render    = render
+        self.colorkey  = colorkey
+        self.alpha     = alpha
+        self.chunks    = ChunkCache(cachesize, self.renderChunk)
+
+    def renderChunk(self, key):
+        surface = self.render(key)
+        opaque  = True
+        if self.colorkey is not None:
+            surface.set_colorkey(self.colorkey)
+            count = pygame.mask.from_surface(surface).count()
+            if count == 0:
+                return (None, False)
+            opaque = count == self.chunksize * self.chunksize
+        if self.alpha is not None:
+            surface.set_alpha(self.alpha)
+            opaque = False
+        return (surface, opaque)
+
+    def getVisibleChunks(self, camera, viewport):
+        """ (surface, opaque, rect on the screen) of the chunks in the viewport. """
+        left = int(camera[0] * self.factor)
+        top  = int(camera[1] * self.factor)
+        chunks = []
+        for y in range(top // self.chunksize, (top + viewport.height - 1) // self.chunksize + 1):
+            for x in range(left // self.chunksize, (left + viewport.width - 1) // self.chunksize + 1):
+                surface, opaque = self.chunks.get((x, y))
+                rect = pygame.Rect(viewport.left + x * self.chunksize - left,
+                                   viewport.top + y * self.chunksize - top,
+                                   self.chunksize, self.chunksize)
+                chunks.append((surface, opaque, rect))
+        return chunks
+
+
+class ParallaxMap(Map):
+
+    """ The map in front of two layers, that scroll slower. """
+
+    def createSurface(self):
+        self.rect  = pygame.Rect(0, 0, self.mappartwidth, self.mappartheight)
+        cachesize  = (self.rect.width // PARALLAX_CHUNKSIZE + 2) * (self.rect.height // PARALLAX_CHUNKSIZE + 2)
+        # From back to front:
+        self.layers = (ParallaxLayer(0.25, PARALLAX_CHUNKSIZE, self.renderSky, cachesize),
+                       ParallaxLayer(0.5, PARALLAX_CHUNKSIZE, self.renderBlocks, cachesize,
+                                     colorkey = COLORS["black"]),
+                       ParallaxLayer(1, self.mappartwidth, self.renderMapPart, CHUNKCACHE_SIZE,
+                                     colorkey = COLORS["grey"]))
+
+    def renderSky(self, key):
+        surface = pygame.Surface((PARALLAX_CHUNKSIZE, PARALLAX_CHUNKSIZE))
+        surface = surface.convert()
+        surface.fill(COLORS["black"])
+        # The same chunk has to look the same again later:
+        r = random.Random(key[0] * 100003 + key[1])
+        for i in range(20):
+            surface.fill(COLORS["lightgrey"], (r.randrange(PARALLAX_CHUNKSIZE), r.randrange(PARALLAX_CHUNKSIZE),
+                                               SCALEFACTOR, SCALEFACTOR))
+        return surface
+
+    def renderBlocks(self, key):
+        surface = pygame.Surface((PARALLAX_CHUNKSIZE, PARALLAX_CHUNKSIZE))
+        surface = surface.convert()
+        surface.fill(COLORS["black"])
+        r = random.Random(key[0] * 100003 + key[1])
+        kind = r.randrange(3)
+        # Either empty, a full block, or a few smaller ones:
+        if kind == 1:
+            surface.fill(COLORS["darkgrey"])
+        elif kind == 2:
+            for i in range(3):
+                size = r.randrange(10, 40) * SCALEFACTOR
+                surface.fill(COLORS["darkgrey"], (r.randrange(PARALLAX_CHUNKSIZE - size),
+                                                  r.randrange(PARALLAX_CHUNKSIZE - size), size, size))
+        return surface
+
+    def renderMapPart(self, key):
+        x, y = key
+        if x < 0 or y < 0 or x >= self.mappartsx or y >= self.mappartsy:
+            surface = pygame.Surface((self.mappartwidth, self.mappartheight))
+            surface.fill(COLORS["grey"])
+            return surface
+        return self.getMapPartSurface(y * self.mappartsx + x + 1)
+
+    def draw(self, surface):
+        viewport = pygame.Rect(self.screenborder[0] // 2, self.screenborder[1] // 2,
+                               self.rect.width, self.rect.height)
+        columns  = -(-viewport.width // COVERCELLSIZE)
+        rows     = -(-viewport.height // COVERCELLSIZE)
+        covered  = bytearray(columns * rows)
+        layers   = []
+        # From front to back, so that it's known, what's covered:
+        for layer in reversed(self.layers):
+            blits = []
+            for chunk, opaque, rect in layer.getVisibleChunks(self.rect.topleft, viewport):
+                if chunk is None:
+                    continue
+                clipped = rect.clip(viewport)
+                left    = (clipped.left - viewport.left) // COVERCELLSIZE
+                right   = (clipped.right - 1 - viewport.left) // COVERCELLSIZE + 1
+                top     = (clipped.top - viewport.top) // COVERCELLSIZE
+                bottom  = (clipped.bottom - 1 - viewport.top) // COVERCELLSIZE + 1
+                if all(covered[y * columns + x] for y in range(top, bottom) for x in range(left, right)):
+                    continue
+                blits.append((chunk, clipped, clipped.move(-rect.left, -rect.top)))
+                if opaque:
+                    self.markCovered(covered, columns, rows, clipped, viewport)
+            layers.append(blits)
+        for blits in reversed(layers):
+            surface.blits(blits, doreturn = False)
+
+    def markCovered(self, covered, columns, rows, rect, viewport):
+        # Only the cells, that are completely inside the rect (cells at the
+        # edges of the viewport end there):
+        left   = -(-(rect.left - viewport.left) // COVERCELLSIZE)
+        top    = -(-(rect.top - viewport.top) // COVERCELLSIZE)
+        right  = columns if rect.right >= viewport.right else (rect.right - viewport.left) // COVERCELLSIZE
+        bottom = rows if rect.bottom >= viewport.bottom else (rect.bottom - viewport.top) // COVERCELLSIZE
+        for y in range(top, bottom):
+            for x in range(left, right):
+                covered[y * columns + x] = 1
+
+
+class Camera:
+
+    """ The position of the viewport on the map. It's kept as floats, but just
+        the integer part is used for drawing. So the fraction is carried on to
+        the next frame, and also slow movements scroll evenly. """
+
+    def __init__(self, map, mode):
+        self.map  = map
+        self.mode = mode
+        self.x    = 0.0
+        self.y    = 0.0
+
+    def getGoal(self, targetx, targety):
+        # Where the camera would be with the target in the middle:
+        return (targetx - self.map.mappart_halfwidth, targety - self.map.mappart_halfheight)
+
+    def jumpTo(self, targetx, targety):
+        self.x, self.y = self.getGoal(targetx, targety)
+        self.clamp()
+
+    def follow(self, targetx, targety, dt):
+        goalx, goaly = self.getGoal(targetx, targety)
+        if self.mode == "ease":
+            # Depends on the time passed, not on the number of frames:
+            k = 1 - math.exp(-dt / CAMERA_EASING)
+            self.x += (goalx - self.x) * k
+            self.y += (goaly - self.y) * k
+        elif self.mode == "deadzone":
+            self.x = min(max(self.x, goalx - DEADZONE[0] / 2), goalx + DEADZONE[0] / 2)
+            self.y = min(max(self.y, goaly - DEADZONE[1] / 2), goaly + DEADZONE[1] / 2)
+        else:
+            self.x = goalx
+            self.y = goaly
+        self.clamp()
+
+    def clamp(self):
+        self.x = min(max(self.x, 0), self.map.lastpart_x)
+        self.y = min(max(self.y, 0), self.map.lastpart_y)
+
+    def getOffset(self):
+        return (int(self.x), int(self.y))
+
+
+class Entity:
+
+    __slots__ = ("x", "y", "kind")
+
+    def __init__(self, x, y, kind):
+        # The middle of the object on the map:
+        self.x    = x
+        self.y    = y
+        self.kind = kind
+
+
+class SpatialGrid:
+
+    """ Keeps objects with the attributes "x" and "y" (map coordinates) in
+        the cells of a uniform grid, that are "cellsize" pixels large. Empty
+        cells aren't stored. So finding the objects in an area only takes
+        a look at the cells it touches. """
+
+    def __init__(self, cellsize):
+        self.cellsize = cellsize
+        self.cells    = {}
+        self.count    = 0
+
+    def getCell(self, x, y):
+        return (int(x) // self.cellsize, int(y) // self.cellsize)
+
+    def insert(self, obj):
+        self.cells.setdefault(self.getCell(obj.x, obj.y), []).append(obj)
+        self.count += 1
+
+    def remove(self, obj):
+        cell = self.getCell(obj.x, obj.y)
+        self.cells[cell].remove(obj)
+        if not self.cells[cell]:
+            del self.cells[cell]
+        self.count -= 1
+
+    def move(self, obj, x, y):
+        if self.getCell(x, y) == self.getCell(obj.x, obj.y):
+            obj.x = x
+            obj.y = y
+            return
+        self.remove(obj)
+        obj.x = x
+        obj.y = y
+        self.insert(obj)
+
+    def query(self, rect):
+        """ The objects, whose positions are inside the rect. """
+        result = []
+        for y in range(rect.top // self.cellsize, (rect.bottom - 1) // self.cellsize + 1):
+            for x in range(rect.left // self.cellsize, (rect.right - 1) // self.cellsize + 1):
+                if (x, y) not in self.cells:
+                    continue
+                for obj in self.cells[(x, y)]:
+                    if rect.collidepoint(obj.x, obj.y):
+                        result.append(obj)
+        return result
+
+    def queryRadius(self, x, y, radius):
+        """ The objects not further away from (x, y) than "radius". """
+        rect = pygame.Rect(int(x - radius), int(y - radius), int(2 * radius) + 2, int(2 * radius) + 2)
+        return [obj for obj in self.query(rect)
+                if (obj.x - x) ** 2 + (obj.y - y) ** 2 <= radius ** 2]
+
+
+class World:
+
+    """ The objects on the map. Only the ones in the viewport are drawn. """
+
+    def __init__(self, map, nrofentities):
+        self.map  = map
+        self.grid = SpatialGrid(GRIDCELLSIZE)
+        self.sprites = []
+        for i in ("red", "blue"):
+            surface = pygame.Surface((ENTITYSIZE, ENTITYSIZE))
+            surface = surface.convert()
+            surface.fill(COLORS[i])
+            self.sprites.append(surface)
+        for i in range(nrofentities):
+            self.grid.insert(Entity(random.randrange(self.map.mapwidth),
+                                    random.randrange(self.map.mapheight),
+                                    random.randrange(len(self.sprites))))
+
+    def draw(self, surface):
+        half = ENTITYSIZE // 2
+        left = self.map.screenborder[0] // 2 - self.map.rect.left - half
+        top  = self.map.screenborder[1] // 2 - self.map.rect.top - half
+        # Also the objects, that are partly in the viewport:
+        blits = [(self.sprites[i.kind], (left + i.x, top + i.y))
+                 for i in self.grid.query(self.map.rect.inflate(ENTITYSIZE, ENTITYSIZE))]
+        clip = surface.get_clip()
+        surface.set_clip(pygame.Rect(self.map.screenborder[0] // 2, self.map.screenborder[1] // 2,
+                                     self.map.rect.width, self.map.rect.height))
+        surface.blits(blits, doreturn = False)
+        surface.set_clip(clip)
+
+    def collect(self, x, y, radius):
+        """ Removes the objects touched by a circle. """
+        touched = self.grid.queryRadius(x, y, radius + ENTITYSIZE // 2)
+        for i in touched:
+            self.grid.remove(i)
+        return len(touched)
+
+
 class Player:
 
     def __init__(self, map, screenborder):
@@ -119,13 +847,13 @@ class Player:
             made only just before drawing or moving. Otherwise also the
             moving map would get confused.
         """
-        self.x = self.map.mappartsx // 2 * self.map.mappartwidth + self.map.mappart_halfwidth
-        self.y = self.map.mappartsy // 2 * self.map.mappartwidth + self.map.mappart_halfheight
+        self.x = min(self.map.mappartsx // 2 * self.map.mappartwidth + self.map.mappart_halfwidth,
+                     self.map.mapwidth // 2)
+        self.y = min(self.map.mappartsy // 2 * self.map.mappartwidth + self.map.mappart_halfheight,
+                     self.map.mapheight // 2)
         self.drawx = self.x
         self.drawy = self.y
-        self.speed  = 3
-        self.setDrawCoordinates()
-        self.map.move(self)
+        self.speed  = PLAYERSPEED
 
     def createSurface(self):
 
@@ -140,33 +868,19 @@ class Player:
                            self.radius * SCALEFACTOR)
 
     def printPosition(self):
-        print self.x, self.y
-        print self.drawx, self.drawy
-        print
+        print(self.x, self.y)
+        print(self.drawx, self.drawy)
+        print()
 
     def setDrawCoordinates(self):
+        # The map has been moved to the camera before:
+        self.drawx = self.x - self.map.rect.left
+        self.drawy = self.y - self.map.rect.top
+        self.rect.topleft = (int(self.drawx) + self.screenborder[0] // 2 - self.radius * SCALEFACTOR, int(self.drawy) + self.screenborder[1] // 2 - self.radius * SCALEFACTOR)
 
-        if self.x < self.map.mappart_halfwidth:
-            self.drawx = self.x
-
-        elif self.x >= self.map.mappart_halfwidth and self.x < self.map.lastpart_x + self.map.mappart_halfwidth:
-            self.drawx = self.map.mappart_halfwidth
-        else:
-            self.drawx = self.x - self.map.lastpart_x
-
-        if self.y < self.map.mappart_halfheight:
-            self.drawy = self.y
+    def move(self, movement, dt):
 
-        elif self.y >= self.map.mappart_halfheight and self.y < self.map.lastpart_y + self.map.mappart_halfheight:
-            self.drawy = self.map.mappart_halfheight
-        else:
-            self.drawy = self.y - self.map.lastpart_y
-
-        self.rect.topleft = (self.drawx + self.screenborder[0] // 2 - self.radius * SCALEFACTOR, self.drawy + self.screenborder[1] // 2 - self.radius * SCALEFACTOR)
-
-    def move(self, movement):
-
-        m = self.speed * SCALEFACTOR
+        m = self.speed * SCALEFACTOR * dt
         r = self.radius * SCALEFACTOR
 
         if movement == "left":
@@ -193,19 +907,83 @@ class Player:
             else:
                 self.y = self.map.mapheight - r
 
-        self.setDrawCoordinates()
-        self.map.move(self)
-
     def draw(self, surface):
         surface.blit(self.surface, self.rect)
 
 
+def createMap(renderer, screenborder, mapparts = (3, 3), mapfile = None):
+    """ "mapparts" is the size of the map in map parts of 9x9 tiles.
+        A "mapfile" made by tilemapfile.py is drawn by "tiles" or "ring". """
+    if renderer == "tiles":
+        return TiledMap(screenborder, mapparts, mapfile)
+    if renderer == "ring":
+        return RingBufferMap(screenborder, mapparts, mapfile)
+    if mapfile:
+        raise ValueError("Map files can only be drawn by the renderers \"tiles\" and \"ring\".")
+    if renderer == "chunks":
+        return ChunkedMap(screenborder, mapparts)
+    if renderer == "threaded":
+        return ThreadedChunkedMap(screenborder, mapparts)
+    if renderer == "parallax":
+        return ParallaxMap(screenborder, mapparts)
+    return Map(screenborder, mapparts)
+
+
+class Scroller:
+
+    """ The map and the camera put together, for use in other programs:
+
+            import scrolling_background
+            scroller = scrolling_background.Scroller((100, 50), "ring", "ease")
+            screen   = pygame.display.set_mode(...)
+            scroller.start(x, y)
+
+        and then in every frame:
+
+            scroller.update(x, y, dt)
+            scroller.draw(screen)
+            screen.blit(sprite, scroller.toScreen(x, y))
+
+        (x, y) is the position on the map, that the camera follows, dt the time
+        of the frame in seconds. The viewport is at "position" on the screen,
+        and has the size of a map part. start() needs the display.
+        "mapparts" and "mapfile" are passed on to createMap(). """
+
+    def __init__(self, position, renderer = "surface", cameramode = "lock",
+                 mapparts = (3, 3), mapfile = None):
+        self.map    = createMap(renderer, (position[0] * 2, position[1] * 2), mapparts, mapfile)
+        self.camera = Camera(self.map, cameramode)
+
+    def start(self, x, y):
+        self.map.createSurface()
+        self.camera.jumpTo(x, y)
+        self.map.move(self.camera)
+
+    def update(self, x, y, dt):
+        self.camera.follow(x, y, dt)
+        self.map.move(self.camera)
+
+    def toScreen(self, x, y):
+        return (int(x) - self.map.rect.left + self.map.screenborder[0] // 2,
+                int(y) - self.map.rect.top + self.map.screenborder[1] // 2)
+
+    def draw(self, surface):
+        self.map.draw(surface)
+
+    def close(self):
+        self.map.close()
+        TEXTCACHE.clear()
+
+
 class Main:
 
-    def __init__(self):
+    def __init__(self, mainloop = True):
 
+        configure(sys.argv[1:])
         self.screenborder = (100 * SCALEFACTOR, 50 * SCALEFACTOR)
-        self.map = Map(self.screenborder)
+        self.scroller = Scroller((self.screenborder[0] // 2, self.screenborder[1] // 2),
+                                 MAPRENDERER, CAMERA, MAPPARTS, MAPFILE)
+        self.map = self.scroller.map
 
         self.movements = {  pygame.K_LEFT   : "left",
                             pygame.K_RIGHT  : "right",
@@ -216,31 +994,68 @@ class Main:
         self.screen = pygame.display.set_mode((self.screenborder[0] + self.map.mappartwidth, self.screenborder[1] + self.map.mappartheight))
         pygame.display.set_caption("Scrolling Background Example")
         pygame.init()
-        self.map.createSurface()
         self.player = Player(self.map, self.screenborder)
+        self.scroller.start(self.player.x, self.player.y)
+        self.player.setDrawCoordinates()
+        self.world = None
+        if ENTITIES:
+            self.world = World(self.map, ENTITIES)
         self.running = True
         self.clock = pygame.time.Clock()
+        self.clocktick = 0
+        self.actions = []
+        if mainloop:
+            self.mainLoop()
 
+    def mainLoop(self):
+        # A frame is split into these steps, so that it can also be driven
+        # from outside (see "benchmark/benchmark.py"):
         while self.running:
-            self.clock.tick(FPS)
-            self.screen.fill(COLORS["darkblue"])
-            if self.processEvents() == "quit":
-                self.running = False
-            self.map.draw(self.screen)
-            self.player.draw(self.screen)
-            pygame.display.flip()
+            self.clocktick = self.clock.tick(FPS)
+            self.handleInput()
+            self.update()
+            self.draw()
+            self.present()
+        self.close()
+
+    def handleInput(self):
+        if self.processEvents() == "quit":
+            self.running = False
+
+    def update(self):
+        dt = min(self.clocktick / 1000, MAX_FRAMETIME)
+        for i in self.actions:
+            self.player.move(i, dt)
+        self.scroller.update(self.player.x, self.player.y, dt)
+        self.player.setDrawCoordinates()
+        if self.world:
+            self.world.collect(self.player.x, self.player.y, self.player.radius * SCALEFACTOR)
+
+    def draw(self):
+        self.screen.fill(COLORS["darkblue"])
+        self.scroller.draw(self.screen)
+        if self.world:
+            self.world.draw(self.screen)
+        self.player.draw(self.screen)
+
+    def present(self):
+        pygame.display.flip()
 
+    def close(self):
+        self.scroller.close()
         pygame.quit()
 
     def processEvents(self):
 
         pygame.event.pump()
         pressed = pygame.key.get_pressed()
+        self.actions = []
         if pressed[pygame.K_q] or pressed[pygame.K_ESCAPE]:
             return "quit"
         for i in self.movements.keys():
             if pressed[i]:
-                self.player.move(self.movements[i])
+                self.actions.append(self.movements[i])
         return 0
 
-Main()
+if __name__ == "__main__":
+    Main()
@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+"""
+    tilemapfile.py - Reads the binary tile map files of scrolling_background.py,
+                     and makes them from text files.
+
+    Copyright (C) 2021 hlubenow
+
+    This program is free software: you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import mmap
+import struct
+import sys
+
+""" A tile map file starts with a header: The letters "TMAP", the version
+    (2 bytes), the width and the height in tiles (4 bytes each, little endian).
+    Then the tile ids follow, one byte per tile, row after row.
+
+    Text maps have a row of tiles in each line. The tile ids are either
+    separated by commas (CSV), or there's one digit per tile. Empty lines
+    and lines starting with "#" are skipped. """
+
+MAGIC   = b"TMAP"
+VERSION = 1
+HEADER  = struct.Struct("<4sHII")
+
+# Number of tile ids, that can be drawn (the TILECOLORS of scrolling_background.py):
+NROFTILES = 4
+
+
+class MappedTileMap:
+
+    """ A tile map in a file. The file is mapped into memory, so the operating
+        system only reads the parts of it, that are used, that is, the rows
+        around the viewport. Has the same methods as "TileMap" in
+        scrolling_background.py.
+        Tile ids without a tile (from "nroftiles" on) are read as 0. So the
+        file doesn't have to be checked as a whole. """
+
+    def __init__(self, filename, nroftiles = NROFTILES):
+        self.fh   = open(filename, "rb")
+        self.data = mmap.mmap(self.fh.fileno(), 0, access = mmap.ACCESS_READ)
+        if len(self.data) < HEADER.size:
+            raise ValueError("Not a tile map file: " + filename)
+        magic, version, self.width, self.height = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a tile map file: " + filename)
+        if len(self.data) < HEADER.size + self.width * self.height:
+            raise ValueError("Tile map file is too short: " + filename)
+        self.table = bytes(i if i < nroftiles else 0 for i in range(256))
+
+    def getTile(self, x, y):
+        return self.table[self.data[HEADER.size + y * self.width + x]]
+
+    def getRow(self, y, left, right):
+        start = HEADER.size + y * self.width
+        return self.data[start + left : start + right].translate(self.table)
+
+    def close(self):
+        self.data.close()
+        self.fh.close()
+
+
+def readTextRows(fh):
+    for line in fh:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if "," in line:
+            yield [int(i) for i in line.split(",")]
+        else:
+            yield [int(i) for i in line]
+
+def convert(textfilename, mapfilename, nroftiles = NROFTILES):
+    """ Writes the rows one by one, so that the text map doesn't have to
+        be read into memory as a whole. The header is written at the end,
+        when the size of the map is known. Tile ids must be lower than
+        "nroftiles". """
+    width  = None
+    height = 0
+    with open(textfilename) as textfile, open(mapfilename, "wb") as mapfile:
+        mapfile.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+        for row in readTextRows(textfile):
+            if width is None:
+                width = len(row)
+            if len(row) != width:
+                raise ValueError("Row %d has %d tiles, not %d." % (height + 1, len(row), width))
+            for i in row:
+                if i < 0 or i >= nroftiles:
+                    raise ValueError("Row %d has the tile id %d, there are only %d tiles." % (height + 1, i, nroftiles))
+            mapfile.write(bytes(row))
+            height += 1
+        mapfile.seek(0)
+        mapfile.write(HEADER.pack(MAGIC, VERSION, width or 0, height))
+    return (width, height)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python3 tilemapfile.py textmap mapfile")
+        sys.exit(1)
+    print("Wrote a map of %dx%d tiles." % convert(sys.argv[1], sys.argv[2]))
@@ -272,7 +272,7 @@ class TextField:
 
 class Main:
 
-    def __init__(self):
+    def __init__(self, mainloop = True):
         self.data  = Data()
         self.env_  = Environment()
         os.environ['SDL_VIDEO_WINDOW_POS'] = "191, 6"
@@ -290,39 +290,60 @@ class Main:
         self.sounds = {}
         self.sounds["click"] = pygame.mixer.Sound("sound/click.wav")
         self.running = True
-
+        self.clocktick = 0
+        self.result = {"keycode" : 0, "quit": False}
+        if mainloop:
+            self.mainLoop()
+
+    def mainLoop(self):
+        # A frame is split into these steps, so that it can also be driven
+        # from outside (see "benchmark/benchmark.py"):
         while self.running:
-            self.clock.tick(FPS)
-            self.screen.fill(self.data.colorset["border"])
-            result = self.getASCIICodeFromKeyboard()
-            if result["quit"]:
-                self.running = False
-
-            if result["keycode"] not in (0, 303, 304):
-                self.playSound("click")
-
-            if result["keycode"] == pygame.K_LEFT:
-                self.tfield.moveCursorLeft()
-            elif result["keycode"] == pygame.K_RIGHT:
-                self.tfield.moveCursorRight()
-            elif result["keycode"] == pygame.K_BACKSPACE:
-                self.tfield.backspace()
-            elif result["keycode"] == pygame.K_DELETE:
-                self.tfield.delChar()
-            elif result["keycode"] == pygame.K_HOME:
-                self.tfield.cursorToStart()
-            elif result["keycode"] == pygame.K_END:
-                self.tfield.cursorToEnd()
-            elif result["keycode"] == pygame.K_RETURN:
-                self.tfield.print_("")
-                self.tfield.printREADY()
-            # Letters:
-            elif result["keycode"] > 31 and result["keycode"] < 127:
-                self.tfield.addChar(chr(result["keycode"]))
-
-            self.paper.draw(self.screen)
-            pygame.display.flip()
-
+            self.clocktick = self.clock.tick(FPS)
+            self.handleInput()
+            self.update()
+            self.draw()
+            self.present()
+        self.close()
+
+    def handleInput(self):
+        self.result = self.getASCIICodeFromKeyboard()
+        if self.result["quit"]:
+            self.running = False
+
+    def update(self):
+        result = self.result
+
+        if result["keycode"] not in (0, 303, 304):
+            self.playSound("click")
+
+        if result["keycode"] == pygame.K_LEFT:
+            self.tfield.moveCursorLeft()
+        elif result["keycode"] == pygame.K_RIGHT:
+            self.tfield.moveCursorRight()
+        elif result["keycode"] == pygame.K_BACKSPACE:
+            self.tfield.backspace()
+        elif result["keycode"] == pygame.K_DELETE:
+            self.tfield.delChar()
+        elif result["keycode"] == pygame.K_HOME:
+            self.tfield.cursorToStart()
+        elif result["keycode"] == pygame.K_END:
+            self.tfield.cursorToEnd()
+        elif result["keycode"] == pygame.K_RETURN:
+            self.tfield.print_("")
+            self.tfield.printREADY()
+        # Letters:
+        elif result["keycode"] > 31 and result["keycode"] < 127:
+            self.tfield.addChar(chr(result["keycode"]))
+
+    def draw(self):
+        self.screen.fill(self.data.colorset["border"])
+        self.paper.draw(self.screen)
+
+    def present(self):
+        pygame.display.flip()
+
+    def close(self):
         pygame.quit()
 
 
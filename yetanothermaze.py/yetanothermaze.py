@@ -506,7 +506,7 @@ class DrawScreen:
 
 class Main:
 
-    def __init__(self):
+    def __init__(self, mainloop = True):
 
         os.environ['SDL_VIDEO_WINDOW_POS'] = "53, 7"
         self.env_ = Environment()
@@ -525,44 +525,64 @@ class Main:
         print()
         print("Welcome to the maze!")
         print()
-
+        self.clocktick = 0
+        self.result = None
+        if mainloop:
+            self.mainLoop()
+
+    def mainLoop(self):
+        # A frame is split into these steps, so that it can also be driven
+        # from outside (see "benchmark/benchmark.py"):
         while self.running:
-            self.clocktickt = self.clock.tick(FPS)
-            self.screen.fill(COLORS["black"])
+            self.clocktick = self.clock.tick(FPS)
+            self.handleInput()
+            self.update()
+            self.draw()
+            self.present()
+        self.close()
+
+    def handleInput(self):
+        self.result = self.processEvents()
+        if self.result == pygame.K_q:
+            self.running = False
+
+    def update(self):
+        result = self.result
 
-            result = self.processEvents()
+        if result == pygame.K_LEFT:
+            self.player.rotateLeft()
 
-            if result == pygame.K_LEFT:
-                self.player.rotateLeft()
+        if result == pygame.K_RIGHT:
+            self.player.rotateRight()
 
-            if result == pygame.K_RIGHT:
-                self.player.rotateRight()
+        if result == pygame.K_UP:
+            self.player.moveForward()
 
-            if result == pygame.K_UP:
-                self.player.moveForward()
+        if result == pygame.K_DOWN:
+            self.player.turnBackwards()
 
-            if result == pygame.K_DOWN:
-                self.player.turnBackwards()
+        if result == pygame.K_SPACE and self.player.cell.isExit:
+            self.running = False
 
-            if result == pygame.K_SPACE and self.player.cell.isExit:
-                self.running = False
+        if self.player.status == "blocked" and not self.player.cell.isExit:
+            self.sounds["wallhit"].play()
+            self.message.show()
 
-            if result == pygame.K_q:
-                self.running = False
+    def draw(self):
+        self.screen.fill(COLORS["black"])
 
-            if self.player.status == "blocked" and not self.player.cell.isExit:
-                self.sounds["wallhit"].play()
-                self.message.show()
+        if self.player.status in ("init", "rotated", "moved"):
+            self.paper.clear()
+            self.paper.drawCells()
 
-            if self.player.status in ("init", "rotated", "moved"):
-                self.paper.clear()
-                self.paper.drawCells()
+        self.paper.draw(self.screen)
+        self.message.draw(self.screen)
+        self.player.status = None
 
-            self.paper.draw(self.screen)
-            self.message.draw(self.screen)
-            self.player.status = None
-            pygame.display.flip()
+    def present(self):
+        pygame.display.flip()
 
+    def close(self):
         pygame.quit()
 
     def processEvents(self):